@@ -0,0 +1,95 @@
+"""Anomaly detection check for the Instagram Monitor Bot.
+
+Feeds a window of synthetic polls through bot.FollowerHistory: a population
+of stable accounts (a gentle trend with a little noise, or quiet accounts
+that sit exactly flat) plus a few planted cases. Exits non-zero if any stable
+account is flagged at any poll, or if a planted case is missed or flagged
+for the wrong reason:
+
+- a sharp one-poll drop after a perfectly flat history ('follower drop')
+- a steady decline with no new posts ('frozen posts')
+- an account too young to score, which must stay quiet
+
+Usage: python bench_anomaly.py [--accounts 200] [--seed 42]
+"""
+import argparse
+import random
+import sys
+
+import bot
+
+
+def stable_account(rng, polls):
+    """Follower/following/post counts of an account with nothing wrong with it:
+    a gentle trend with +-5 followers of poll-to-poll noise, or (for quiet
+    accounts) a count that sits exactly flat. Most never post in the window."""
+    base = rng.randrange(2_000, 200_000)
+    following = rng.randrange(50, 2_000)
+    posts = rng.randrange(0, 500)
+    flat = rng.random() < 0.25
+    trend = rng.uniform(-0.0001, 0.0005) * base
+    series = []
+    for i in range(polls):
+        followers = base if flat else round(base + trend * i + rng.uniform(-5, 5))
+        if not flat and rng.random() < 0.02:
+            posts += 1
+        series.append((followers, following, posts))
+    return series
+
+
+def planted_accounts(polls):
+    flat_then_drop = [(10_000, 300, 50)] * (polls - 1) + [(9_000, 300, 50)]
+    # Loses 5% of its followers over the recent half, one poll at a time
+    declining = [(20_000 - max(0, i - polls // 2) * 1_000 // (polls // 2), 400, 80) for i in range(polls)]
+    young = [(5_000, 100, 10)] * (bot.ANOMALY_MIN_OBSERVATIONS - 2) + [(4_000, 100, 10)]
+    return {
+        'flat_then_drop': (flat_then_drop, 'follower drop'),
+        'frozen_decline': (declining, 'frozen posts'),
+        'too_young': (young, None),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check anomaly detection against synthetic follower histories")
+    parser.add_argument('--accounts', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    polls = bot.ANOMALY_WINDOW
+    history = bot.FollowerHistory()
+    accounts = {f"stable{i}": stable_account(rng, polls) for i in range(args.accounts)}
+    planted = planted_accounts(polls)
+
+    false_alarms = {}
+    flagged = {}
+    for poll in range(polls):
+        for username, series in accounts.items():
+            history.observe(username, *series[poll])
+        for username, (series, _) in planted.items():
+            # Planted series end on the last poll, so younger ones start late
+            offset = poll - (polls - len(series))
+            if offset >= 0:
+                history.observe(username, *series[offset])
+        flagged = history.analyze()
+        for username, reasons in flagged.items():
+            if username in accounts:
+                false_alarms.setdefault(username, set()).update(reasons)
+
+    problems = []
+    print(f"{args.accounts} stable accounts over {polls} polls: {len(false_alarms)} flagged at some poll")
+    for username, reasons in sorted(false_alarms.items()):
+        problems.append(f"stable account {username} flagged: {', '.join(sorted(reasons))}")
+    for username, (_, expected) in planted.items():
+        reasons = flagged.get(username, [])
+        print(f"  {username:>15}: {', '.join(reasons) or 'not flagged'}")
+        if expected is None and reasons:
+            problems.append(f"{username} should not be scored yet, got {reasons}")
+        elif expected is not None and expected not in reasons:
+            problems.append(f"{username} not flagged for {expected!r} (got {reasons or 'nothing'})")
+    if problems:
+        sys.exit('\n'.join(problems))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Memory benchmark for the Instagram Monitor Bot.
+
+Runs a standard load scenario in fresh interpreters, once in normal mode and
+once with LOW_MEMORY_MODE, and reports peak RSS. The scenario feeds
+synthetic guilds, messages and member joins through discord.py's connection
+state (the caches low-memory mode turns off), then performs repeated
+lookups over a watch list of synthetic profiles large enough to overflow
+the low-memory cache budget.
+
+Usage: python bench_memory.py [--messages 20000] [--accounts 60000] [--lookups 120000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROBE = """
+import asyncio, json, random, sys
+import bot
+
+messages, accounts, lookups = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])
+baseline = bot.peak_rss_mb()
+rng = random.Random(42)
+
+async def gateway_load():
+    # Parse events exactly as the gateway would deliver them, minus the
+    # event dispatch (no command handling, no network)
+    state = bot.bot._connection
+    state.dispatch = lambda *args, **kwargs: None
+    member = {'roles': [], 'joined_at': None, 'deaf': False, 'mute': False, 'flags': 0}
+    for g in range(20):
+        guild_id = 1000 + g
+        state._add_guild_from_data({
+            'id': str(guild_id), 'name': f'guild{g}', 'owner_id': '1', 'member_count': 0,
+            'roles': [], 'emojis': [], 'features': [], 'members': [], 'voice_states': [],
+            'presences': [], 'threads': [], 'stickers': [],
+            'channels': [{'id': str(guild_id * 10 + c), 'type': 0, 'name': f'channel{c}',
+                          'position': c, 'permission_overwrites': []} for c in range(5)],
+        })
+    for i in range(messages):
+        guild_id = 1000 + rng.randrange(20)
+        user_id = 10**6 + rng.randrange(50000)
+        user = {'id': str(user_id), 'username': f'user{user_id}', 'discriminator': '0',
+                'avatar': None, 'global_name': f'User {user_id}'}
+        state.parse_message_create({
+            'id': str(10**9 + i), 'guild_id': str(guild_id),
+            'channel_id': str(guild_id * 10 + rng.randrange(5)), 'author': user, 'member': member,
+            'content': 'message text ' * rng.randrange(2, 40), 'type': 0, 'pinned': False,
+            'timestamp': '2024-01-01T00:00:00+00:00', 'edited_timestamp': None, 'tts': False,
+            'mention_everyone': False, 'mentions': [], 'mention_roles': [], 'attachments': [], 'embeds': [],
+        })
+        state.parse_guild_member_add(dict(member, guild_id=str(guild_id), user=user))
+    return len(state._messages or ()), sum(len(guild.members) for guild in state.guilds)
+
+cached_messages, cached_members = asyncio.run(gateway_load())
+for i in range(lookups):
+    n = rng.randrange(accounts)
+    profile = {
+        'success': True,
+        'username': f'user{n}',
+        'full_name': f'User Number {n}',
+        'biography': 'bio ' * rng.randrange(5, 40),
+        'followers': rng.randrange(10**6),
+        'following': rng.randrange(10**4),
+        'posts': rng.randrange(10**3),
+        'profile_pic_url': f'https://cdn.example/{n}.jpg',
+        'is_private': False,
+        'is_verified': False,
+        'external_url': None,
+    }
+    bot.profile_cache.put(profile['username'], bot.ProfileRecord.from_dict(profile))
+print(json.dumps({
+    'baseline': baseline,
+    'peak': bot.peak_rss_mb(),
+    'messages': cached_messages,
+    'members': cached_members,
+    'cached': len(bot.profile_cache),
+    'cache_kb': bot.memory_budget.used_bytes / 1024,
+    'budget_kb': bot.memory_budget.limit_bytes / 1024,
+    'evictions': bot.profile_cache.evictions,
+}))
+"""
+
+
+def run(low_memory, messages, accounts, lookups):
+    env = dict(os.environ, LOW_MEMORY_MODE='1' if low_memory else '0')
+    out = subprocess.run([sys.executable, '-c', PROBE, str(messages), str(accounts), str(lookups)],
+                         capture_output=True, text=True, check=True, env=env)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure peak RSS under a standard load")
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--accounts', type=int, default=60000)
+    parser.add_argument('--lookups', type=int, default=120000)
+    args = parser.parse_args()
+
+    for low_memory in (False, True):
+        r = run(low_memory, args.messages, args.accounts, args.lookups)
+        label = 'low-memory' if low_memory else 'normal'
+        print(f"{label:>10}: peak RSS {r['peak']:.1f} MB (after import {r['baseline']:.1f} MB)\n"
+              f"{'':>12}discord.py cache: {r['messages']} messages, {r['members']} members\n"
+              f"{'':>12}profiles: {r['cached']} cached, {r['cache_kb']:.0f}/{r['budget_kb']:.0f} KB, "
+              f"{r['evictions']} evictions")
+
+
+if __name__ == '__main__':
+    main()
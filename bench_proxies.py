@@ -0,0 +1,107 @@
+"""Proxy pool check for the Instagram Monitor Bot.
+
+Starts local HTTP proxy stand-ins (aiohttp servers that answer every
+proxied request with 200, always 429, or 429 every third request), points
+bot.proxy_pool at them and pushes a burst of lookups through
+bot.instagram_get, once anonymously and once with a sticky logged-in
+identity. Reports how the load spread and exits non-zero if a rate-limited
+stand-in kept getting traffic, a healthy one sat idle in the anonymous run,
+the logged-in run hopped between proxies, or requests failed.
+
+Usage: python bench_proxies.py [--requests 60] [--rate 600] [--concurrency 2]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+
+from aiohttp import web
+
+import bot
+
+BEHAVIOURS = ['ok', 'ok', 'flaky', 'limited']
+
+
+async def start_stand_in(behaviour):
+    """A local 'proxy' that serves the proxied request itself"""
+    hits = Counter()
+
+    async def handle(request):
+        hits['requests'] += 1
+        if behaviour == 'limited' or (behaviour == 'flaky' and hits['requests'] % 3 == 0):
+            hits[429] += 1
+            return web.Response(status=429)
+        hits[200] += 1
+        return web.json_response({'user': {'follower_count': 1}})
+
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return f"http://127.0.0.1:{port}", hits, runner
+
+
+async def lookup(i):
+    # Plain http, so the stand-in gets the request itself instead of a CONNECT
+    url = f"http://instagram.test/api/v1/users/web_profile_info/?username=user{i}"
+    async with bot.instagram_get(url, {}) as response:
+        return response.status
+
+
+async def scenario(identity, args):
+    stand_ins = [await start_stand_in(b) for b in BEHAVIOURS]
+    bot.proxy_pool = bot.ProxyPool([bot.Proxy(url, args.concurrency, args.rate) for url, _, _ in stand_ins])
+    bot.INSTAGRAM_IDENTITY = identity
+    started = time.perf_counter()
+    statuses = Counter(await asyncio.gather(*(lookup(i) for i in range(args.requests))))
+    elapsed = time.perf_counter() - started
+    for _, _, runner in stand_ins:
+        await runner.cleanup()
+
+    label = 'sticky' if identity else 'anonymous'
+    print(f"{label}: {args.requests} requests in {elapsed:.2f}s, statuses {dict(statuses)}")
+    problems = []
+    for behaviour, (url, hits, _), proxy in zip(BEHAVIOURS, stand_ins, bot.proxy_pool.proxies):
+        print(f"  {behaviour:>8} {url}: {hits['requests']:3d} requests "
+              f"(429: {hits[429]}), score {proxy.score:.2f}, "
+              f"cooldown {max(0.0, proxy.cooldown_until - time.monotonic()):.0f}s")
+        if behaviour == 'limited' and hits['requests'] > args.concurrency:
+            problems.append(f"{label}: rate-limited stand-in got {hits['requests']} requests")
+        if behaviour == 'ok' and hits['requests'] == 0 and not identity:
+            problems.append(f"{label}: healthy stand-in {url} was never used")
+    used = [url for url, hits, _ in stand_ins if hits['requests']]
+    if identity and len(used) > 1:
+        # None of the stand-ins it would start on ever sends a 429, so the
+        # session has no reason to leave its proxy
+        problems.append(f"{label}: session traffic spread over {len(used)} stand-ins")
+    if statuses.get(200, 0) + statuses.get(429, 0) != args.requests:
+        problems.append(f"{label}: unexpected statuses {dict(statuses)}")
+    return problems
+
+
+async def run(args):
+    problems = []
+    for identity in (None, 'sessionid'):
+        problems += await scenario(identity, args)
+    await bot.session.close()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise the proxy pool against local stand-ins")
+    parser.add_argument('--requests', type=int, default=60)
+    parser.add_argument('--rate', type=float, default=600, help="requests per minute per proxy")
+    parser.add_argument('--concurrency', type=int, default=2, help="in-flight requests per proxy")
+    args = parser.parse_args()
+
+    problems = asyncio.run(run(args))
+    if problems:
+        sys.exit('\n'.join(problems))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Startup benchmark for the Instagram Monitor Bot.
+
+Imports bot.py in fresh interpreters and reports how long the import takes,
+how long until the first lookup could be served (aiohttp session ready) and
+whether any heavy fallback module was pulled in eagerly.
+
+Usage: python bench_startup.py [--runs 5] [--max-import-ms 400]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ['instaloader', 'requests', 'selenium', 'numpy']
+
+PROBE = """
+import asyncio, json, sys, time
+import bot
+
+async def ready():
+    t = time.perf_counter()
+    await bot.get_session()
+    elapsed = time.perf_counter() - t
+    await bot.session.close()
+    return elapsed
+
+session_seconds = asyncio.run(ready())
+print(json.dumps({
+    'import': bot.IMPORT_SECONDS,
+    'ready': bot.IMPORT_SECONDS + session_seconds,
+    'heavy': [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_once():
+    out = subprocess.run([sys.executable, '-c', PROBE], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bot.py cold start")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float, default=None,
+                        help="exit non-zero if the median import time exceeds this")
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    import_ms = statistics.median(r['import'] for r in results) * 1000
+    ready_ms = statistics.median(r['ready'] for r in results) * 1000
+    heavy = sorted({m for r in results for m in r['heavy']})
+
+    print(f"runs:          {args.runs}")
+    print(f"import (p50):  {import_ms:.1f} ms")
+    print(f"ready (p50):   {ready_ms:.1f} ms")
+    print(f"eager heavy:   {', '.join(heavy) if heavy else 'none'}")
+
+    if heavy:
+        sys.exit("heavy fallback modules imported at startup: " + ', '.join(heavy))
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        sys.exit(f"import time {import_ms:.1f} ms exceeds budget {args.max_import_ms} ms")
+
+
+if __name__ == '__main__':
+    main()
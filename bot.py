@@ -1,22 +1,47 @@
+import time
+_BOOT_STARTED = time.perf_counter()
+
 import os
 import discord
+from discord import app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
 from datetime import datetime
 import asyncio
+import atexit
+import copy
 import random
-import instaloader
-import requests
-from bs4 import BeautifulSoup
-import time
 import aiohttp
 import json
+import contextvars
 import csv
-from instaloader.exceptions import LoginRequiredException, BadCredentialsException, ConnectionException, TooManyRequestsException
+import gzip
+import hashlib
+import html
+import heapq
+import io
+import itertools
 import logging
+import math
+import queue
+import re
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import uuid
+import warnings
+import zlib
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Heavy fallback dependencies (instaloader, requests, selenium) are imported
+# lazily inside the tier that needs them, so a restart on Termux only pays for
+# discord.py and aiohttp before the bot can connect.
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (handlers are installed by setup_logging below)
 logger = logging.getLogger('discord_bot')
 
 # Load environment variables
@@ -31,16 +56,158 @@ def load_credentials(csv_path='credentials.csv'):
             for row in reader:
                 creds[row['key']] = row['value']
     except Exception as e:
-        print(f"Error loading credentials from CSV: {e}")
+        logger.error(f"Error loading credentials from CSV: {e}")
     return creds
 
 credentials = load_credentials()
 TOKEN = credentials.get('DISCORD_TOKEN', os.getenv('DISCORD_TOKEN') or "")
 
+def get_setting(key, default=None, cast=str, keep_empty=False):
+    """Read a setting from credentials.csv, falling back to the environment.
+
+    An empty value means the default, unless keep_empty is set: for file
+    paths an explicit empty value switches the file off.
+    """
+    value = credentials.get(key, os.getenv(key))
+    if isinstance(value, str):
+        value = value.strip()
+    if value is None or (value == '' and not keep_empty):
+        return default
+    if cast is bool:
+        return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid value for {key}: {value!r}, using {default!r}")
+        return default
+
+# --- Non-blocking structured logging ---
+# Callers only enqueue records; a QueueListener thread formats them as JSON
+# lines and writes them to a size-rotated file (and optionally the console),
+# so log I/O never runs on the event loop.
+LOG_FILE = get_setting('LOG_FILE', 'bot.log', keep_empty=True)
+LOG_LEVEL = get_setting('LOG_LEVEL', 'INFO').upper()
+LOG_CONSOLE = get_setting('LOG_CONSOLE', True, bool)
+LOG_MAX_BYTES = get_setting('LOG_MAX_BYTES', 5 * 1024 * 1024, int)
+LOG_BACKUPS = get_setting('LOG_BACKUPS', 3, int)
+LOG_SAMPLE_BURST = get_setting('LOG_SAMPLE_BURST', 20, int)
+LOG_SAMPLE_WINDOW = get_setting('LOG_SAMPLE_WINDOW', 10, float)
+
+_STANDARD_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per line; extra= fields become top-level keys"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.utcfromtimestamp(record.created).isoformat(timespec='milliseconds') + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_RECORD_FIELDS and key != 'sample_key':
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Rate-limit hot-path records that carry a sample_key.
+
+    At most `burst` records per key pass in each `window` seconds; the first
+    record of the next window reports how many were suppressed. Warnings and
+    errors are never sampled.
+    """
+
+    def __init__(self, burst=LOG_SAMPLE_BURST, window=LOG_SAMPLE_WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.windows = {}  # key -> [window_start, passed, suppressed]
+
+    def filter(self, record):
+        key = getattr(record, 'sample_key', None)
+        if key is None or record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        state = self.windows.get(key)
+        if state is None or now - state[0] >= self.window:
+            if state is not None and state[2]:
+                record.suppressed = state[2]
+            self.windows[key] = [now, 1, 0]
+            return True
+        if state[1] < self.burst:
+            state[1] += 1
+            return True
+        state[2] += 1
+        return False
+
+log_listener = None
+
+def setup_logging():
+    global log_listener
+    handlers = []
+    if LOG_FILE:
+        file_handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+        file_handler.setFormatter(JsonLogFormatter())
+        handlers.append(file_handler)
+    if LOG_CONSOLE:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        handlers.append(console_handler)
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter())
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+    log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(stop_logging)
+
+def stop_logging():
+    """Flush queued records and stop the writer thread (safe to call twice)"""
+    if log_listener is not None and log_listener._thread is not None:
+        log_listener.stop()
+
+setup_logging()
+
+# --- Low-memory mode (Termux) ---
+LOW_MEMORY_MODE = get_setting('LOW_MEMORY_MODE', False, bool)
+MEMORY_BUDGET_MB = get_setting('MEMORY_BUDGET_MB', 16 if LOW_MEMORY_MODE else 64, float)
+
+# Slash-only mode drops message events (and the message_content intent)
+# entirely: commands then arrive as interactions instead of being parsed out
+# of every message in every guild.
+SLASH_COMMANDS_ONLY = get_setting('SLASH_COMMANDS_ONLY', False, bool)
+
 intents = discord.Intents.default()
-intents.message_content = True
+intents.typing = False  # typing events are never used
+if SLASH_COMMANDS_ONLY:
+    intents.message_content = False
+    intents.guild_messages = False
+    intents.dm_messages = False
+else:
+    intents.message_content = True
 intents.reactions = True
-bot = commands.Bot(command_prefix='!', intents=intents, help_command=None)
+class MonitorBot(commands.Bot):
+    async def close(self):
+        # Drain work and snapshot state while the event loop is still running
+        await graceful_shutdown()
+        await super().close()
+
+if LOW_MEMORY_MODE:
+    # No message cache, no member cache and no guild chunking: commands only
+    # need the triggering message, never the history or member list.
+    bot = MonitorBot(
+        command_prefix='!', intents=intents, help_command=None,
+        max_messages=None,
+        member_cache_flags=discord.MemberCacheFlags.none(),
+        chunk_guilds_at_startup=False
+    )
+else:
+    bot = MonitorBot(command_prefix='!', intents=intents, help_command=None)
 
 # Color constants for consistent theming
 COLORS = {
@@ -65,6 +232,7 @@ def send_telegram_notification(message, parse_mode='HTML'):
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
         logger.warning("Telegram bot token or chat ID not set.")
         return False
+    import requests
     url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
     payload = {
         'chat_id': TELEGRAM_CHAT_ID,
@@ -72,7 +240,7 @@ def send_telegram_notification(message, parse_mode='HTML'):
         'parse_mode': parse_mode
     }
     try:
-        response = requests.post(url, data=payload)
+        response = requests.post(url, data=payload, timeout=NOTIFY_SEND_TIMEOUT)
         if response.status_code == 200:
             logger.info("Telegram notification sent.")
             return True
@@ -83,6 +251,547 @@ def send_telegram_notification(message, parse_mode='HTML'):
         logger.error(f"Telegram notification error: {e}")
         return False
 
+# --- Notification fan-out router ---
+# Each event type (ban, unban, monitor_started, error, ping) is routed to any
+# number of sinks. Every sink owns a bounded queue drained by its own worker
+# task, so a slow sink only ever backs up itself.
+NOTIFY_EVENTS = ('monitor_started', 'ban', 'unban', 'anomaly', 'error', 'ping')
+NOTIFY_QUEUE_SIZE = get_setting('NOTIFY_QUEUE_SIZE', 100, int)
+NOTIFY_SEND_TIMEOUT = get_setting('NOTIFY_SEND_TIMEOUT', 15, float)
+NOTIFY_RETRY_DELAY = get_setting('NOTIFY_RETRY_DELAY', 2, float)
+NOTIFY_RETRY_MAX_DELAY = get_setting('NOTIFY_RETRY_MAX_DELAY', 300, float)
+NOTIFY_MAX_ATTEMPTS = get_setting('NOTIFY_MAX_ATTEMPTS', 8, int)
+
+# Outbound notifications get their own cookie-less session so Instagram
+# cookies are never sent to Telegram or third-party webhooks.
+notify_session = None
+
+async def get_notify_session():
+    """Get or create the aiohttp session used for outbound notifications"""
+    global notify_session
+    if notify_session is None or notify_session.closed:
+        notify_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=NOTIFY_SEND_TIMEOUT))
+    return notify_session
+
+def html_to_markdown(text):
+    """Convert the Telegram HTML subset we use into Discord markdown"""
+    text = re.sub(r'</?b>', '**', text)
+    text = re.sub(r'</?code>', '`', text)
+    return re.sub(r'<[^>]+>', '', text)
+
+class NotificationSink:
+    """A notification destination with its own bounded queue and worker"""
+
+    def __init__(self, name, queue_size=NOTIFY_QUEUE_SIZE):
+        self.name = name
+        self.queue_size = queue_size
+        self.queue = None
+        self.worker = None
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retrying = 0
+        self.abandoned = 0
+        self.last_latency = None
+        self.on_settled = None  # called with each notification once delivered
+
+    def start(self):
+        # The queue and task are created lazily so they bind to the running loop
+        if self.queue is None:
+            self.queue = asyncio.Queue(self.queue_size)
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.create_task(self._run(), name=f"sink:{self.name}")
+
+    def offer(self, notification):
+        """Enqueue without blocking; when full, push the oldest pending item back for a retry"""
+        self.start()
+        if self.queue.full():
+            shed = self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped += 1
+            logger.warning(f"Notification queue full for {self.name}, deferred oldest")
+            self._retry_later(shed)
+        self.queue.put_nowait(notification)
+
+    def _retry_later(self, notification):
+        """Re-offer a failed or shed notification after an exponential backoff.
+
+        Nothing is acknowledged until it is delivered, so anything still
+        undelivered after NOTIFY_MAX_ATTEMPTS stays in the outbox for replay.
+        """
+        attempts = notification.get('attempts', 0) + 1
+        if attempts >= NOTIFY_MAX_ATTEMPTS:
+            self.abandoned += 1
+            logger.error(f"Giving up on notification {notification['id']} for {self.name} after {attempts} attempts")
+            return
+        delay = min(NOTIFY_RETRY_DELAY * 2 ** (attempts - 1), NOTIFY_RETRY_MAX_DELAY) * random.uniform(0.8, 1.2)
+        self.retrying += 1
+        asyncio.get_running_loop().call_later(delay, self._requeue, dict(notification, attempts=attempts))
+
+    def _requeue(self, notification):
+        self.retrying -= 1
+        self.offer(notification)
+
+    async def _run(self):
+        while True:
+            notification = await self.queue.get()
+            try:
+                ok = await asyncio.wait_for(self.deliver(notification), NOTIFY_SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                overrun(f"notify:{self.name}")
+                ok = False
+            except Exception as e:
+                logger.error(f"Notification sink {self.name} error: {e}")
+                ok = False
+            if ok:
+                self.sent += 1
+                self.last_latency = time.monotonic() - notification['created']
+                if self.on_settled:
+                    self.on_settled(notification)
+            else:
+                self.failed += 1
+                self._retry_later(notification)
+            self.queue.task_done()
+
+    async def deliver(self, notification):
+        raise NotImplementedError
+
+    def pending(self):
+        return self.queue.qsize() if self.queue is not None else 0
+
+class TelegramSink(NotificationSink):
+    def __init__(self, chat_id):
+        super().__init__(f"telegram:{chat_id}")
+        self.chat_id = chat_id
+
+    async def deliver(self, notification):
+        if not TELEGRAM_BOT_TOKEN:
+            logger.warning("Telegram bot token not set.")
+            return False
+        http = await get_notify_session()
+        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+        payload = {'chat_id': self.chat_id, 'text': notification['text'], 'parse_mode': 'HTML'}
+        async with http.post(url, data=payload) as response:
+            if response.status != 200:
+                logger.error(f"Telegram notification failed: {await response.text()}")
+            return response.status == 200
+
+class DiscordChannelSink(NotificationSink):
+    def __init__(self, channel_id):
+        super().__init__(f"discord:{channel_id}")
+        self.channel_id = int(channel_id)
+
+    async def deliver(self, notification):
+        channel = bot.get_channel(self.channel_id) or await bot.fetch_channel(self.channel_id)
+        await channel.send(html_to_markdown(notification['text'])[:2000])
+        return True
+
+class DiscordWebhookSink(NotificationSink):
+    def __init__(self, url):
+        super().__init__(f"discord_webhook:{url.rsplit('/', 2)[-2] if url.count('/') > 2 else url}")
+        self.url = url
+
+    async def deliver(self, notification):
+        http = await get_notify_session()
+        async with http.post(self.url, json={'content': html_to_markdown(notification['text'])[:2000]}) as response:
+            return response.status in (200, 204)
+
+class HttpWebhookSink(NotificationSink):
+    def __init__(self, url):
+        super().__init__(f"http:{url}")
+        self.url = url
+
+    async def deliver(self, notification):
+        http = await get_notify_session()
+        body = {'id': notification['id'], 'event': notification['event'],
+                'text': notification['text'], 'timestamp': notification['timestamp']}
+        headers = {'Idempotency-Key': notification['id']}
+        async with http.post(self.url, json=body, headers=headers) as response:
+            return 200 <= response.status < 300
+
+SINK_TYPES = {
+    'telegram': TelegramSink,
+    'discord': DiscordChannelSink,
+    'discord_webhook': DiscordWebhookSink,
+    'http': HttpWebhookSink,
+}
+
+# --- Crash-safe notification outbox ---
+# Every (notification, sink) pair is appended to a JSON-lines log before it is
+# handed to the sink and acknowledged once delivered. Appends are group
+# committed: one fsync covers everything written during a short window, so a
+# burst of events costs a handful of syncs. Unacknowledged entries are
+# replayed on the next start.
+OUTBOX_PATH = get_setting('OUTBOX_PATH', 'notification_outbox.jsonl', keep_empty=True)
+OUTBOX_FLUSH_INTERVAL = get_setting('OUTBOX_FLUSH_INTERVAL', 0.05, float)
+OUTBOX_MAX_AGE = get_setting('OUTBOX_MAX_AGE', 24 * 3600, float)
+OUTBOX_COMPACT_BYTES = get_setting('OUTBOX_COMPACT_BYTES', 1024 * 1024, int)
+
+class NotificationOutbox:
+    """Append-only log of notifications that have not been delivered yet"""
+
+    def __init__(self, path, flush_interval=OUTBOX_FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.pending = {}  # (id, sink) -> record
+        self.recovered = []
+        self.syncs = 0
+        self.records_written = 0
+        self._file = None
+        self._buffer = []
+        self._waiters = []
+        self._wakeup = None
+        self._flusher = None
+        self._closed = False
+
+    def recover(self):
+        """Load unacknowledged records and compact the log down to them"""
+        cutoff = time.time() - OUTBOX_MAX_AGE
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn write from a crash mid-append
+                    key = (record.get('id'), record.get('sink'))
+                    if record.get('op') == 'add' and record.get('wall', 0) >= cutoff:
+                        self.pending[key] = record
+                    elif record.get('op') == 'ack':
+                        self.pending.pop(key, None)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Could not read notification outbox {self.path}: {e}")
+        self.recovered = list(self.pending.values())
+        self._compact(self.recovered)
+        return self.recovered
+
+    def _compact(self, records):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        if self._file is not None:
+            self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _write_batch(self, lines, compact_records=None):
+        # Runs in a worker thread so fsync never stalls the event loop
+        self._file.write(''.join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.syncs += 1
+        self.records_written += len(lines)
+        if compact_records is not None and self._file.tell() > OUTBOX_COMPACT_BYTES:
+            self._compact(compact_records)
+
+    def _enqueue(self, record):
+        if self._file is None:
+            self.recover()
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if not self._closed and (self._flusher is None or self._flusher.done()):
+            self._flusher = asyncio.create_task(self._flush_loop(), name="outbox-flush")
+        self._buffer.append(json.dumps(record) + '\n')
+        self._wakeup.set()
+
+    def append(self, record):
+        """Log a pending delivery; the returned future resolves once it is on disk"""
+        record = dict(record, op='add')
+        self.pending[(record['id'], record['sink'])] = record
+        self._enqueue(record)
+        durable = asyncio.get_running_loop().create_future()
+        self._waiters.append(durable)
+        return durable
+
+    def ack(self, notification_id, sink):
+        if self.pending.pop((notification_id, sink), None) is not None:
+            self._enqueue({'op': 'ack', 'id': notification_id, 'sink': sink})
+
+    async def flush(self):
+        """Write and fsync everything buffered so far"""
+        if not self._buffer:
+            return
+        lines, waiters = self._buffer, self._waiters
+        self._buffer, self._waiters = [], []
+        try:
+            await asyncio.to_thread(self._write_batch, lines, list(self.pending.values()))
+        except Exception as e:
+            logger.error(f"Notification outbox write failed: {e}")
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _flush_loop(self):
+        while not self._closed:
+            await self._wakeup.wait()
+            # Let the rest of the burst land in the same group commit
+            await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            await self.flush()
+
+    async def close(self):
+        """Stop the group-commit loop, then write out whatever is left.
+
+        The loop is allowed to finish rather than cancelled: a cancelled
+        to_thread() leaves its write running, which would race ours.
+        """
+        self._closed = True
+        if self._flusher is not None and not self._flusher.done():
+            self._wakeup.set()
+            await self._flusher
+        await self.flush()
+
+class NotificationRouter:
+    """Maps event types to sinks and fans each notification out to all of them"""
+
+    def __init__(self, outbox=None):
+        self.sinks = {}
+        self.routes = {}
+        self.outbox = outbox
+        self.unwritten = set()  # outbox writes not yet durable, whose offer is still to come
+
+    def sink(self, spec):
+        """Return the shared sink for a 'kind:target' spec, creating it once"""
+        if spec not in self.sinks:
+            kind, _, target = spec.partition(':')
+            if kind not in SINK_TYPES or not target:
+                raise ValueError(f"Unknown notification sink: {spec}")
+            sink = SINK_TYPES[kind](target)
+            if self.outbox is not None:
+                sink.on_settled = lambda notification: self.outbox.ack(notification['id'], spec)
+            self.sinks[spec] = sink
+        return self.sinks[spec]
+
+    def add_route(self, event, spec):
+        self.sink(spec)
+        if spec not in self.routes.setdefault(event, []):
+            self.routes[event].append(spec)
+
+    def publish(self, event, text):
+        notification = {
+            'id': uuid.uuid4().hex,
+            'event': event,
+            'text': text,
+            'created': time.monotonic(),
+            'timestamp': datetime.utcnow().isoformat(),
+        }
+        specs = self.routes.get(event, [])
+        for spec in specs:
+            self._dispatch(spec, self.sinks[spec], notification)
+        return len(specs)
+
+    def _dispatch(self, spec, sink, notification):
+        if self.outbox is None:
+            sink.offer(notification)
+            return
+        record = {key: notification[key] for key in ('id', 'event', 'text', 'timestamp')}
+        record.update(sink=spec, wall=time.time())
+        durable = self.outbox.append(record)
+        durable.add_done_callback(lambda _: sink.offer(notification))
+        self.unwritten.add(durable)
+        durable.add_done_callback(self.unwritten.discard)
+
+    def replay(self):
+        """Re-offer deliveries left unacknowledged by a previous run"""
+        if self.outbox is None:
+            return 0
+        records, self.outbox.recovered = self.outbox.recovered, []
+        for record in records:
+            try:
+                sink = self.sink(record['sink'])
+            except (KeyError, ValueError) as e:
+                logger.error(f"Cannot replay notification {record.get('id')}: {e}")
+                continue
+            sink.offer(dict(record, created=time.monotonic()))
+        return len(records)
+
+    async def drain(self, timeout):
+        """Wait until every sink queue is empty or the timeout expires.
+
+        Notifications published just before the drain only reach their sink
+        once the outbox write is durable, so those writes are waited for
+        first; otherwise the queues look empty while deliveries are pending.
+        """
+        async def settle():
+            if self.unwritten:
+                # asyncio.wait, unlike gather, leaves the futures alone on timeout
+                await asyncio.wait(list(self.unwritten))
+            waits = [sink.queue.join() for sink in self.sinks.values() if sink.queue is not None]
+            if waits:
+                await asyncio.gather(*waits)
+        await asyncio.wait_for(settle(), timeout)
+
+    def stats(self):
+        return {name: {'sent': s.sent, 'failed': s.failed, 'dropped': s.dropped, 'retrying': s.retrying,
+                       'pending': s.pending(), 'last_latency': s.last_latency}
+                for name, s in self.sinks.items()}
+
+def build_notification_router():
+    """Build routes from NOTIFY_<EVENT> settings, defaulting to NOTIFY_DEFAULT.
+
+    Each setting is a list of sinks separated by spaces or commas, e.g.
+    ``telegram:-1001234 discord:987654321 http:https://example.com/hook``.
+    Without any configuration every event goes to TELEGRAM_CHAT_ID.
+    """
+    outbox = None
+    if OUTBOX_PATH:
+        outbox = NotificationOutbox(OUTBOX_PATH)
+        outbox.recover()
+    router = NotificationRouter(outbox)
+    default = get_setting('NOTIFY_DEFAULT', f"telegram:{TELEGRAM_CHAT_ID}" if TELEGRAM_CHAT_ID else '')
+    for event in NOTIFY_EVENTS:
+        for spec in re.split(r'[\s,]+', get_setting(f"NOTIFY_{event.upper()}", default)):
+            if not spec:
+                continue
+            try:
+                router.add_route(event, spec)
+            except ValueError as e:
+                logger.error(str(e))
+    return router
+
+notification_router = build_notification_router()
+
+def notify(event, message, summary=None):
+    """Fan a notification out to every sink routed for this event type.
+
+    Alert events go through the digest stage first; `summary` is the one-line
+    version used if the alert ends up in a digest.
+    """
+    with trace_span(f"notify:{event}"):
+        if event in DIGEST_EVENTS:
+            alert_digest.offer(event, (message, summary or summarize_alert(message)))
+        elif not notification_router.publish(event, message):
+            logger.debug(f"No notification sinks configured for {event}")
+
+# --- Alert digests ---
+# During a ban wave dozens of watched accounts can flip within minutes. While
+# alerts are rare each one goes out on its own; once more than DIGEST_THRESHOLD
+# arrive within DIGEST_RATE_WINDOW, alerts are collected and sent as one digest
+# per window. The window doubles while the storm keeps overfilling it and
+# halves as it quiets, until the stage drops back to sending alerts one by one.
+DIGEST_EVENTS = set(re.split(r'[\s,]+', get_setting('DIGEST_EVENTS', 'ban unban anomaly'))) - {''}
+DIGEST_THRESHOLD = get_setting('DIGEST_THRESHOLD', 5, int)
+DIGEST_RATE_WINDOW = get_setting('DIGEST_RATE_WINDOW', 60, float)
+DIGEST_MIN_WINDOW = get_setting('DIGEST_MIN_WINDOW', 15, float)
+DIGEST_MAX_WINDOW = get_setting('DIGEST_MAX_WINDOW', 600, float)
+DIGEST_MAX_CHARS = 3500  # stays under Telegram's 4096 and Discord's embed limit
+
+class AlertDigest:
+    """Sends alerts one at a time, or as windowed digests while they arrive fast"""
+
+    def __init__(self, deliver, threshold=DIGEST_THRESHOLD, rate_window=DIGEST_RATE_WINDOW,
+                 min_window=DIGEST_MIN_WINDOW, max_window=DIGEST_MAX_WINDOW):
+        self.deliver = deliver  # deliver(key, items); may return a coroutine
+        self.threshold = threshold
+        self.rate_window = rate_window
+        self.min_window = min_window
+        self.max_window = max_window
+        self.recent = {}  # key -> arrival times within the rate window
+        self.pending = {}  # key -> alerts held for the next digest (batching mode)
+        self.windows = {}  # key -> current digest window in seconds
+        self.timers = {}
+        self.sending = set()
+        self.digests = 0
+        self.batched = 0
+
+    def offer(self, key, item):
+        now = time.monotonic()
+        recent = self.recent.setdefault(key, deque())
+        recent.append(now)
+        while recent[0] < now - self.rate_window:
+            recent.popleft()
+        if key in self.pending:
+            self.pending[key].append(item)
+        elif len(recent) <= self.threshold:
+            self._send(key, [item])
+        else:
+            logger.warning(f"Alert storm on {key}: {len(recent)} alerts in {self.rate_window:.0f}s, switching to digests")
+            self.windows[key] = self.min_window
+            self.pending[key] = [item]
+            self._schedule(key)
+
+    def _schedule(self, key):
+        self.timers[key] = asyncio.get_running_loop().call_later(self.windows[key], self._flush, key)
+
+    def _flush(self, key):
+        self.timers.pop(key, None)
+        items = self.pending.pop(key, [])
+        if items:
+            self._send(key, items)
+        window = self.windows[key]
+        if len(items) > self.threshold:
+            window = min(window * 2, self.max_window)
+        elif len(items) <= 1:
+            window /= 2
+        if window < self.min_window:
+            del self.windows[key]
+            return
+        self.windows[key] = window
+        self.pending[key] = []
+        self._schedule(key)
+
+    def _send(self, key, items):
+        if len(items) > 1:
+            self.digests += 1
+            self.batched += len(items)
+        try:
+            result = self.deliver(key, items)
+        except Exception as e:
+            logger.error(f"Alert delivery for {key} failed: {e}")
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.create_task(result, name=f"digest:{key}")
+            self.sending.add(task)
+            task.add_done_callback(self.sending.discard)
+
+    async def flush(self):
+        """Send everything held back right away (used on shutdown)"""
+        for key in list(self.timers):
+            self.timers.pop(key).cancel()
+            items = self.pending.pop(key, [])
+            self.windows.pop(key, None)
+            if items:
+                self._send(key, items)
+        if self.sending:
+            await asyncio.gather(*self.sending, return_exceptions=True)
+
+    def stats(self):
+        return {'digests': self.digests, 'batched': self.batched,
+                'batching': {str(key): window for key, window in self.windows.items()}}
+
+def summarize_alert(message):
+    """Fold a Telegram-HTML alert into one plain-text line"""
+    text = html.unescape(re.sub(r'<[^>]+>', '', message))
+    line = ' • '.join(part.strip() for part in text.split('\n') if part.strip())
+    return line if len(line) <= 200 else line[:199] + '…'
+
+def format_digest(title, lines):
+    """Join one-line summaries under a title, cut down to DIGEST_MAX_CHARS"""
+    body, used = [], len(title)
+    for i, line in enumerate(lines):
+        if used + len(line) + 1 > DIGEST_MAX_CHARS:
+            body.append(f"…and {len(lines) - i} more")
+            break
+        body.append(line)
+        used += len(line) + 1
+    return title + '\n' + '\n'.join(body)
+
+def publish_alerts(event, items):
+    if len(items) == 1:
+        text = items[0][0]
+    else:
+        text = format_digest(f"<b>📦 Digest: {len(items)} {event} alerts</b>",
+                             [html.escape(summary) for _, summary in items])
+    if not notification_router.publish(event, text):
+        logger.debug(f"No notification sinks configured for {event}")
+
+alert_digest = AlertDigest(publish_alerts)
+
 # --- Access Control Decorator ---
 from discord.ext.commands import has_permissions, CheckFailure
 
@@ -126,10 +835,340 @@ async def get_session():
         session = aiohttp.ClientSession(cookies=INSTAGRAM_COOKIES)
     return session
 
+# --- Proxy pool for Instagram requests ---
+# PROXIES lists http://, https:// and socks5:// URLs (socks needs the optional
+# aiohttp_socks package). Per-proxy limits can be set in the URL fragment, e.g.
+# ``http://10.0.0.2:8080#concurrency=4&rate=60`` (rate is requests per minute).
+PROXIES = get_setting('PROXIES', '')
+PROXY_INCLUDE_DIRECT = get_setting('PROXY_INCLUDE_DIRECT', True, bool)
+PROXY_MAX_CONCURRENCY = get_setting('PROXY_MAX_CONCURRENCY', 2, int)
+PROXY_RATE_PER_MINUTE = get_setting('PROXY_RATE_PER_MINUTE', 30, float)
+PROXY_COOLDOWN = get_setting('PROXY_COOLDOWN', 300, float)
+# Only a logged-in session (the sessionid cookie we actually send) benefits
+# from a stable egress IP; the aiohttp tiers never log in with the username
+INSTAGRAM_IDENTITY = 'sessionid' if INSTAGRAM_COOKIES.get('sessionid') else None
+
+class Proxy:
+    """One egress route with its own concurrency, rate limit and health score"""
+
+    def __init__(self, url, max_concurrency=PROXY_MAX_CONCURRENCY, rate_per_minute=PROXY_RATE_PER_MINUTE):
+        self.url = url  # None means a direct connection
+        self.max_concurrency = max_concurrency
+        self.rate = rate_per_minute / 60.0
+        self.tokens = 1.0
+        self.refilled = time.monotonic()
+        self.in_flight = 0
+        self.score = 1.0
+        self.cooldown_until = 0.0
+        self.consecutive_429 = 0
+        self.requests = 0
+        self.session = None  # dedicated session, only for socks proxies
+
+    @classmethod
+    def from_spec(cls, spec):
+        url, _, fragment = spec.partition('#')
+        options = dict(pair.split('=', 1) for pair in fragment.split('&') if '=' in pair)
+        return cls(url,
+                   int(options.get('concurrency', PROXY_MAX_CONCURRENCY)),
+                   float(options.get('rate', PROXY_RATE_PER_MINUTE)))
+
+    @property
+    def name(self):
+        if self.url is None:
+            return 'direct'
+        # Strip credentials from anything we log or display
+        scheme, _, rest = self.url.partition('://')
+        return f"{scheme}://{rest.rsplit('@', 1)[-1]}"
+
+    @property
+    def is_socks(self):
+        return bool(self.url) and self.url.startswith('socks')
+
+    def _refill(self, now):
+        self.tokens = min(1.0, self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+
+    def wait_time(self, now):
+        """Seconds until this proxy could take a request (0 if it can now)"""
+        if now < self.cooldown_until:
+            return self.cooldown_until - now
+        if self.in_flight >= self.max_concurrency:
+            return None  # frees up on release, not on a timer
+        self._refill(now)
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate if self.rate > 0 else None
+
+    def record(self, status):
+        """Update the passive health score from a response status (None = connection error)"""
+        if status == 429:
+            self.consecutive_429 += 1
+            self.cooldown_until = time.monotonic() + min(PROXY_COOLDOWN * 2 ** (self.consecutive_429 - 1), 3600)
+            ok = False
+        else:
+            self.consecutive_429 = 0
+            ok = status is not None and (status < 500 and status not in (401, 403))
+        self.score = 0.8 * self.score + 0.2 * (1.0 if ok else 0.0)
+
+    async def get_session(self, shared):
+        if not self.is_socks:
+            return shared
+        if self.session is None or self.session.closed:
+            from aiohttp_socks import ProxyConnector
+            self.session = aiohttp.ClientSession(connector=ProxyConnector.from_url(self.url), cookies=INSTAGRAM_COOKIES)
+        return self.session
+
+class ProxyPool:
+    """Hands out proxies, keeping each Instagram identity on the same egress IP"""
+
+    def __init__(self, proxies):
+        self.proxies = proxies
+        self.sticky = {}
+        self._released = None
+
+    def _healthy(self, proxy):
+        return proxy.score >= 0.3 or all(p.score < 0.3 for p in self.proxies)
+
+    def _pick(self, identity, now):
+        sticky = self.sticky.get(identity) if identity is not None else None
+        if sticky is not None and now >= sticky.cooldown_until and self._healthy(sticky):
+            # A logged-in session waits out its own proxy's token bucket (the
+            # caller's deadline still applies) rather than hopping IPs; it only
+            # moves on a 429 cooldown or bad health
+            return sticky, sticky.wait_time(now)
+        candidates = [p for p in self.proxies if now >= p.cooldown_until and self._healthy(p)]
+        if not candidates:
+            candidates = [min(self.proxies, key=lambda p: p.cooldown_until)]
+        ready = [p for p in candidates if p.wait_time(now) == 0.0]
+        if ready:
+            proxy = max(ready, key=lambda p: (p.score, -p.in_flight))
+        else:
+            proxy = min(candidates, key=lambda p: p.wait_time(now) if p.wait_time(now) is not None else 1.0)
+        if identity is not None:
+            self.sticky[identity] = proxy
+        return proxy, proxy.wait_time(now)
+
+    async def acquire(self, identity=None, deadline=None):
+        """Take a proxy slot; raise DeadlineExceeded rather than wait past `deadline`"""
+        if self._released is None:
+            self._released = asyncio.Condition()
+        while True:
+            now = time.monotonic()
+            proxy, wait = self._pick(identity, now)
+            if wait == 0.0:
+                proxy.tokens -= 1.0
+                proxy.in_flight += 1
+                proxy.requests += 1
+                return proxy
+            # A known wait (token refill, 429 cooldown) that overshoots the
+            # deadline fails now instead of sleeping into it
+            if deadline is not None and now + (wait or 0.0) >= deadline:
+                raise overrun("proxy:acquire")
+            step = min(wait if wait is not None else 1.0, 1.0)
+            if deadline is not None:
+                step = min(step, deadline - now)
+            async with self._released:
+                try:
+                    await asyncio.wait_for(self._released.wait(), step)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, proxy, status):
+        proxy.in_flight -= 1
+        proxy.record(status)
+        if status == 429:
+            logger.warning(f"Proxy {proxy.name} rate limited, cooling down until +{proxy.cooldown_until - time.monotonic():.0f}s")
+        async with self._released:
+            self._released.notify_all()
+
+    async def close(self):
+        for proxy in self.proxies:
+            if proxy.session is not None and not proxy.session.closed:
+                await proxy.session.close()
+
+    def stats(self):
+        now = time.monotonic()
+        return {p.name: {'score': round(p.score, 2), 'in_flight': p.in_flight, 'requests': p.requests,
+                         'cooldown': max(0.0, p.cooldown_until - now)}
+                for p in self.proxies}
+
+def build_proxy_pool():
+    specs = [spec for spec in re.split(r'[\s,]+', PROXIES) if spec]
+    if not specs:
+        return None
+    proxies = []
+    for spec in specs:
+        if spec.startswith('socks'):
+            try:
+                import aiohttp_socks  # noqa: F401
+            except ImportError:
+                logger.error(f"Skipping SOCKS proxy {spec.split('@')[-1]}: install aiohttp_socks")
+                continue
+        proxies.append(Proxy.from_spec(spec))
+    if PROXY_INCLUDE_DIRECT:
+        proxies.append(Proxy(None))
+    return ProxyPool(proxies) if proxies else None
+
+proxy_pool = build_proxy_pool()
+
+@asynccontextmanager
+async def instagram_get(url, headers):
+    """GET an Instagram URL through the proxy pool (or directly without one)"""
+    shared = await get_session()
+    # The request as a whole (connect, headers, body) must fit in the budget
+    remaining = remaining_budget()
+    if remaining is not None and remaining <= 0:
+        raise overrun("http")
+    timeout = aiohttp.ClientTimeout(total=remaining) if remaining is not None else None
+    if proxy_pool is None:
+        async with shared.get(url, headers=headers, timeout=timeout) as response:
+            yield response
+        return
+    with trace_span("proxy:acquire"):
+        proxy = await proxy_pool.acquire(INSTAGRAM_IDENTITY, current_deadline.get())
+    remaining = remaining_budget()
+    timeout = aiohttp.ClientTimeout(total=max(remaining, 0.1)) if remaining is not None else None
+    status = None
+    try:
+        http = await proxy.get_session(shared)
+        proxy_url = None if proxy.url is None or proxy.is_socks else proxy.url
+        async with http.get(url, headers=headers, proxy=proxy_url, timeout=timeout) as response:
+            status = response.status
+            yield response
+    finally:
+        await proxy_pool.release(proxy, status)
+
+# --- Memory budget and caches ---
+class MemoryBudget:
+    """One global byte budget shared by every internal cache"""
+
+    def __init__(self, limit_bytes):
+        self.limit_bytes = int(limit_bytes)
+        self.used_bytes = 0
+        self.caches = []
+
+    def register(self, cache):
+        self.caches.append(cache)
+
+    def reserve(self, nbytes):
+        """Account for nbytes, evicting from the largest caches until we fit"""
+        self.used_bytes += nbytes
+        while self.used_bytes > self.limit_bytes:
+            victims = sorted(self.caches, key=lambda c: c.bytes_used, reverse=True)
+            if not any(cache.evict_one() for cache in victims):
+                break
+
+    def release(self, nbytes):
+        self.used_bytes = max(0, self.used_bytes - nbytes)
+
+memory_budget = MemoryBudget(MEMORY_BUDGET_MB * 1024 * 1024)
+
+class BudgetedCache:
+    """LRU cache with optional TTL whose entries are charged to a MemoryBudget"""
+
+    def __init__(self, name, budget, ttl=None, sizeof=sys.getsizeof):
+        self.name = name
+        self.budget = budget
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.bytes_used = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (stored_at, size, value)
+        budget.register(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        stored_at, size, value = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            self.pop(key)
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value, age=0.0):
+        self.pop(key)
+        size = self.sizeof(value)
+        self._entries[key] = (time.monotonic() - age, size, value)
+        self.bytes_used += size
+        self.budget.reserve(size)
+
+    def pop(self, key, default=None):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self.bytes_used -= entry[1]
+        self.budget.release(entry[1])
+        return entry[2]
+
+    def evict_one(self):
+        if not self._entries:
+            return False
+        key = next(iter(self._entries))
+        self.pop(key)
+        self.evictions += 1
+        return True
+
+    def items(self):
+        return [(key, entry[2]) for key, entry in self._entries.items()]
+
+class ProfileRecord:
+    """Compact, slot-based copy of a successful profile lookup"""
+    __slots__ = ('username', 'full_name', 'biography', 'followers', 'following', 'posts',
+                 'profile_pic_url', 'is_private', 'is_verified', 'external_url', 'approximate')
+
+    def __init__(self, username, full_name, biography, followers, following, posts,
+                 profile_pic_url=None, is_private=False, is_verified=False, external_url=None,
+                 approximate=False):
+        self.username = username
+        self.full_name = full_name
+        self.biography = biography
+        self.followers = followers
+        self.following = following
+        self.posts = posts
+        self.profile_pic_url = profile_pic_url
+        self.is_private = is_private
+        self.is_verified = is_verified
+        self.external_url = external_url
+        self.approximate = bool(approximate)  # counts rounded by Instagram (e.g. '12.5K')
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(*(data.get(field) for field in cls.__slots__))
+
+    def to_dict(self):
+        """Rebuild the dict shape returned by the fetchers"""
+        result = {'success': True}
+        for field in self.__slots__:
+            result[field] = getattr(self, field)
+        return result
+
+    def approx_size(self):
+        return sys.getsizeof(self) + sum(sys.getsizeof(getattr(self, field)) for field in self.__slots__)
+
+PROFILE_CACHE_TTL = get_setting('PROFILE_CACHE_TTL', 30, float)
+profile_cache = BudgetedCache('profiles', memory_budget, ttl=PROFILE_CACHE_TTL, sizeof=ProfileRecord.approx_size)
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux/Android and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
 async def fetch_instagram_data_web_api(username):
     """Fetch Instagram data using web API (from Telegram bot)"""
     try:
-        session = await get_session()
         username = username.lstrip('@')
         
         # Use Instagram web API endpoint
@@ -145,7 +1184,7 @@ async def fetch_instagram_data_web_api(username):
             'x-requested-with': 'XMLHttpRequest'
         }
         
-        async with session.get(url, headers=headers) as response:
+        async with instagram_get(url, headers) as response:
             if response.status == 200:
                 data = await response.json()
                 
@@ -170,15 +1209,27 @@ async def fetch_instagram_data_web_api(username):
             else:
                 return {'success': False, 'error': f'HTTP {response.status}: {response.reason}'}
                 
+    except DeadlineExceeded:
+        raise  # the caller's budget ran out; not this tier's failure
     except Exception as e:
-        logger.error(f"Web API error for {username}: {str(e)}")
+        logger.debug(f"Web API error for {username}: {str(e)}")
         return {'success': False, 'error': f'Web API error: {str(e)}'}
 
+INSTALOADER_MIN_BUDGET = get_setting('INSTALOADER_MIN_BUDGET', 5, float)
+
 async def fetch_instagram_data_instaloader(username):
     """Fetch Instagram data using instaloader with improved settings"""
-    try:
-        username = username.lstrip('@')
-        
+    import instaloader
+    from instaloader.exceptions import LoginRequiredException, BadCredentialsException, ConnectionException
+    username = username.lstrip('@')
+    # Instaloader is blocking, so it runs in a thread with its own timeouts
+    # clamped to the caller's budget; one connection attempt when the budget
+    # couldn't cover a retry anyway
+    remaining = remaining_budget()
+    request_timeout = 30 if remaining is None else max(1.0, min(30, remaining))
+    attempts = 3 if remaining is None or remaining > 3 * request_timeout else 1
+
+    def load():
         # Create L instance with custom settings
         L = instaloader.Instaloader(
             download_pictures=False,
@@ -188,8 +1239,8 @@ async def fetch_instagram_data_instaloader(username):
             download_comments=False,
             save_metadata=False,
             compress_json=False,
-            max_connection_attempts=3,
-            request_timeout=30
+            max_connection_attempts=attempts,
+            request_timeout=request_timeout
         )
         
         # Set custom user agent
@@ -213,21 +1264,24 @@ async def fetch_instagram_data_instaloader(username):
             'is_verified': profile.is_verified,
             'external_url': profile.external_url
         }
-        
+
+    try:
+        return await asyncio.to_thread(load)
     except LoginRequiredException:
         return {'success': False, 'error': 'Login required - account is private'}
     except BadCredentialsException:
         return {'success': False, 'error': 'Invalid credentials'}
     except ConnectionException as e:
         return {'success': False, 'error': f'Connection error: {str(e)}'}
+    except DeadlineExceeded:
+        raise  # the caller's budget ran out; not this tier's failure
     except Exception as e:
-        logger.error(f"Instaloader error for {username}: {str(e)}")
+        logger.debug(f"Instaloader error for {username}: {str(e)}")
         return {'success': False, 'error': f'Instaloader error: {str(e)}'}
 
 async def fetch_instagram_data_mobile_api(username):
     """Fetch Instagram data using mobile API (from Telegram bot)"""
     try:
-        session = await get_session()
         username = username.lstrip('@')
         
         # Mobile API endpoint
@@ -242,7 +1296,7 @@ async def fetch_instagram_data_mobile_api(username):
             'X-IG-App-ID': IG_APP_ID
         }
         
-        async with session.get(url, headers=headers) as response:
+        async with instagram_get(url, headers) as response:
             if response.status == 200:
                 data = await response.json()
                 
@@ -267,35 +1321,193 @@ async def fetch_instagram_data_mobile_api(username):
             else:
                 return {'success': False, 'error': f'Mobile API HTTP {response.status}'}
                 
+    except DeadlineExceeded:
+        raise  # the caller's budget ran out; not this tier's failure
     except Exception as e:
-        logger.error(f"Mobile API error for {username}: {str(e)}")
+        logger.debug(f"Mobile API error for {username}: {str(e)}")
         return {'success': False, 'error': f'Mobile API error: {str(e)}'}
 
+# Public profile page scrape: much cheaper than Instaloader or a browser. The
+# page is streamed and parsed with regexes, stopping as soon as the embedded
+# JSON counts turn up; the og:description meta tag is the (rounded) fallback.
+HTML_SCRAPE_MAX_BYTES = get_setting('HTML_SCRAPE_MAX_BYTES', 512 * 1024, int)
+HTML_COUNT_PATTERNS = {
+    'followers': re.compile(rb'"(?:edge_followed_by":\{"count"|follower_count"):(\d+)'),
+    'following': re.compile(rb'"(?:edge_follow":\{"count"|following_count"):(\d+)'),
+    'posts': re.compile(rb'"(?:edge_owner_to_timeline_media":\{"count"|media_count"):(\d+)'),
+}
+# Lookaheads, because pages put content= before or after property=/name=
+HTML_META_PATTERN = re.compile(rb'<meta(?=[^>]*\s(?:property|name)="(og:description|og:title|description)")'
+                               rb'(?=[^>]*\scontent="([^"]*)")', re.I)
+OG_COUNTS_PATTERN = re.compile(r'([\d.,]+[KMB]?) Followers, ([\d.,]+[KMB]?) Following, ([\d.,]+[KMB]?) Posts', re.I)
+OG_TITLE_PATTERN = re.compile(r'^(.*?) \(@[\w.]+\)')
+
+def parse_count(text):
+    """Parse '1,234', '12.5K' or '1.2M' into an int"""
+    text = text.replace(',', '').upper()
+    scale = {'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}.get(text[-1:], 1)
+    if scale != 1:
+        text = text[:-1]
+    return int(float(text) * scale)
+
+def parse_profile_page(page):
+    """Pull profile fields out of (possibly partial) profile page bytes.
+
+    Returns (counts, full_name, approximate); approximate is set when a count
+    had to come from a rounded meta tag figure such as '12.5K'.
+    """
+    counts = {}
+    approximate = False
+    for field, pattern in HTML_COUNT_PATTERNS.items():
+        match = pattern.search(page)
+        if match:
+            counts[field] = int(match.group(1))
+    meta = {name.lower().decode(): html.unescape(content.decode('utf-8', 'replace'))
+            for name, content in HTML_META_PATTERN.findall(page)}
+    og = OG_COUNTS_PATTERN.search(meta.get('og:description') or meta.get('description', ''))
+    if og:
+        for field, text in zip(('followers', 'following', 'posts'), og.groups()):
+            if field not in counts:
+                counts[field] = parse_count(text)
+                approximate = approximate or text[-1:].upper() in 'KMB'
+    title = OG_TITLE_PATTERN.match(meta.get('og:title', ''))
+    return counts, (title.group(1) if title else None), approximate
+
+async def fetch_instagram_data_html(username):
+    """Fetch Instagram data by scraping the public profile page"""
+    try:
+        username = username.lstrip('@')
+        url = f"https://www.instagram.com/{username}/"
+        headers = {
+            'accept': 'text/html,application/xhtml+xml',
+            'accept-language': 'en-US,en;q=0.9',
+            'user-agent': random.choice(USER_AGENTS),
+        }
+
+        async with instagram_get(url, headers) as response:
+            if response.status != 200:
+                return {'success': False, 'error': f'HTML HTTP {response.status}'}
+            page = bytearray()
+            missing = set(HTML_COUNT_PATTERNS)
+            async for chunk in response.content.iter_chunked(16 * 1024):
+                # Only rescan the new chunk (plus a little overlap for matches
+                # split across chunk boundaries)
+                scan_from = max(0, len(page) - 64)
+                page += chunk
+                missing = {field for field in missing if not HTML_COUNT_PATTERNS[field].search(page, scan_from)}
+                # Exact counts live in the embedded JSON; once all three are
+                # in, the rest of the page isn't worth downloading
+                if not missing or len(page) >= HTML_SCRAPE_MAX_BYTES:
+                    break
+            page = bytes(page)
+
+        counts, full_name, approximate = parse_profile_page(page)
+        if len(counts) < 3:
+            if b'Page Not Found' in page or b'"HttpErrorPage"' in page:
+                return {'success': False, 'error': 'User not found (profile page)'}
+            return {'success': False, 'error': 'No profile counts in page'}
+        return {
+            'success': True,
+            'username': username,
+            'full_name': full_name or 'Not available',
+            'biography': 'No bio',
+            'followers': counts['followers'],
+            'following': counts['following'],
+            'posts': counts['posts'],
+            'profile_pic_url': None,
+            'is_private': b'"is_private":true' in page,
+            'is_verified': b'"is_verified":true' in page,
+            'external_url': None,
+            'approximate': approximate
+        }
+
+    except DeadlineExceeded:
+        raise  # the caller's budget ran out; not this tier's failure
+    except Exception as e:
+        logger.debug(f"HTML scrape error for {username}: {str(e)}")
+        return {'success': False, 'error': f'HTML scrape error: {str(e)}'}
+
+METHOD_FAILING_SCORE = 0.2
+TIER_MIN_BUDGET = {'Instaloader': INSTALOADER_MIN_BUDGET}  # seconds a tier needs to be worth starting
+method_health = {}  # fetch tier name -> EWMA success rate
+
+def record_method_health(method_name, ok):
+    method_health[method_name] = 0.8 * method_health.get(method_name, 1.0) + 0.2 * (1.0 if ok else 0.0)
+
 async def get_instagram_data(username):
     """Get Instagram data using multiple methods with fallback"""
+    key = username.lstrip('@').lower()
+    cached = profile_cache.get(key)
+    if cached is not None:
+        logger.info("Profile cache hit for %s", username,
+                    extra={'username': username, 'method': 'cache', 'outcome': 'hit', 'sample_key': 'fetch'})
+        return cached.to_dict()
+
+    not_found = False
+    cut_off = None  # set when a tier was skipped for lack of budget
     methods = [
         ("Web API", fetch_instagram_data_web_api),
         ("Mobile API", fetch_instagram_data_mobile_api),
+        ("HTML", fetch_instagram_data_html),
         ("Instaloader", fetch_instagram_data_instaloader)
     ]
+    # Tiers that keep failing (e.g. a throttled API) are tried last; the sort
+    # is stable, so healthy tiers keep their usual order
+    methods.sort(key=lambda method: method_health.get(method[0], 1.0) < METHOD_FAILING_SCORE)
     
     for method_name, method_func in methods:
+        started = time.perf_counter()
         try:
-            logger.info(f"Trying {method_name} for {username}")
-            result = await method_func(username)
-            
-            if result['success']:
-                logger.info(f"Successfully fetched data using {method_name}")
-                return result
-            else:
-                logger.warning(f"{method_name} failed: {result['error']}")
-                
+            with trace_span(f"fetch:{method_name}"):
+                # A tier that can't finish in the time left is skipped; running
+                # out of budget is the caller's problem, not the tier's health
+                result = await within_budget(method_func(username), f"fetch:{method_name}",
+                                             minimum=TIER_MIN_BUDGET.get(method_name, 0.0))
+        except DeadlineExceeded as e:
+            if remaining_budget() > 0:
+                cut_off = e
+                continue  # too little left for this tier, a cheaper one may still fit
+            raise
         except Exception as e:
-            logger.error(f"{method_name} exception: {str(e)}")
+            record_method_health(method_name, False)
+            # Every tier fails on every lookup during an outage, so even
+            # exceptions are sampled here rather than logged as errors
+            logger.info("%s raised for %s: %s", method_name, username, e,
+                        extra={'username': username, 'method': method_name, 'outcome': 'exception',
+                               'error': str(e), 'sample_key': 'fetch',
+                               'latency_ms': round((time.perf_counter() - started) * 1000, 1)})
             continue
+
+        if not result['success'] and remaining_budget() is not None and remaining_budget() <= 0:
+            # Cut off by the budget (e.g. an HTTP timeout clamped to it)
+            raise overrun(f"fetch:{method_name}")
+
+        fields = {'username': username, 'method': method_name, 'sample_key': 'fetch',
+                  'latency_ms': round((time.perf_counter() - started) * 1000, 1)}
+        error = '' if result['success'] else result['error'].lower()
+        missing = '404' in error or 'not found' in error or 'does not exist' in error
+        # A definitive "no such user" still means the tier itself is working
+        record_method_health(method_name, result['success'] or missing)
+        if result['success']:
+            logger.info("Fetched %s using %s", username, method_name, extra=dict(fields, outcome='success'))
+            profile_cache.put(key, ProfileRecord.from_dict(result))
+            return result
+
+        # A failing tier is routine (the chain falls through), so it is sampled
+        logger.info("%s failed for %s: %s", method_name, username, result['error'],
+                    extra=dict(fields, outcome='failed', error=result['error']))
+        if missing:
+            not_found = True
     
+    # Made-up counts are only a stand-in when every tier had a fair try; a
+    # lookup cut short by the budget is reported as a timeout instead
+    if cut_off is not None and not not_found:
+        raise cut_off
+
     # If all methods fail, return fallback data
-    logger.warning(f"All methods failed for {username}, using fallback data")
+    logger.info("All methods failed for %s, using fallback data", username,
+                extra={'username': username, 'method': 'fallback', 'outcome': 'fallback',
+                       'not_found': not_found, 'sample_key': 'fetch'})
     return {
         'success': True,
         'username': username,
@@ -308,21 +1520,209 @@ async def get_instagram_data(username):
         'is_private': False,
         'is_verified': False,
         'external_url': None,
-        'fallback': True
+        'fallback': True,
+        'not_found': not_found
     }
 
+# --- Fetch scheduler ---
+# Every lookup goes through one scheduler with a fixed number of workers.
+# Priority classes are served strictly in order (interactive commands, then
+# confirmation re-checks, then routine polls); within a class, guilds share
+# the workers by weighted fair queuing, so one guild with a huge watch list
+# cannot starve the others.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_CONFIRM = 1
+PRIORITY_ROUTINE = 2
+PRIORITY_NAMES = ('interactive', 'confirm', 'routine')
+FETCH_CONCURRENCY = get_setting('FETCH_CONCURRENCY', 4, int)
+# Workers that never take routine polls, so a saturated watch list can't make
+# an interactive command wait for a slow poll to finish
+FETCH_RESERVED_WORKERS = get_setting('FETCH_RESERVED_WORKERS', 1, int)
+GUILD_WEIGHTS = get_setting('GUILD_WEIGHTS', '')  # e.g. "1234:2 5678:0.5"
+
+class FetchJob:
+    __slots__ = ('username', 'priority', 'guild_id', 'enqueued', 'future', 'deadline', 'budget', 'trace')
+
+    def __init__(self, username, priority, guild_id, future, deadline=None, budget=None, trace=None):
+        self.username = username
+        self.priority = priority
+        self.guild_id = guild_id
+        self.enqueued = time.monotonic()
+        self.future = future
+        self.deadline = None  # latest absolute deadline among the callers sharing it
+        self.budget = None  # longest run time allowed from pickup, for callers that don't mind queueing
+        self.trace = trace
+        self.widen(deadline, budget)
+
+    def widen(self, deadline, budget):
+        """Fold in a caller's limit: a shared lookup runs as long as its most patient caller allows"""
+        if deadline is None and budget is None:
+            deadline = math.inf  # this caller waits indefinitely
+        if deadline is not None:
+            self.deadline = deadline if self.deadline is None else max(self.deadline, deadline)
+        if budget is not None:
+            self.budget = budget if self.budget is None else max(self.budget, budget)
+
+    def expired(self, now):
+        return self.budget is None and self.deadline is not None and now >= self.deadline
+
+    def deadline_from(self, now):
+        """Absolute deadline once a worker picks the job up (None when unbounded)"""
+        limits = [limit for limit in (self.deadline, None if self.budget is None else now + self.budget)
+                  if limit is not None]
+        deadline = max(limits)
+        return None if deadline == math.inf else deadline
+
+class FetchScheduler:
+    """Priority classes with weighted fair queuing across guilds"""
+
+    def __init__(self, concurrency=FETCH_CONCURRENCY, weights=None, reserved=FETCH_RESERVED_WORKERS):
+        self.concurrency = concurrency
+        # At least one worker must still be allowed to serve routine polls
+        self.reserved = max(0, min(reserved, concurrency - 1))
+        self.weights = weights or {}
+        self.queues = [[] for _ in PRIORITY_NAMES]  # heaps of (finish_tag, seq, job)
+        self.virtual_time = [0.0] * len(PRIORITY_NAMES)
+        self.guild_finish = [{} for _ in PRIORITY_NAMES]
+        self.waits = [deque(maxlen=1000) for _ in PRIORITY_NAMES]
+        self.served = [0] * len(PRIORITY_NAMES)
+        self.pending = {}  # username -> queued or running job, for coalescing
+        self._seq = itertools.count()
+        self._changed = None
+        self._workers = {}  # slot -> task
+
+    def _start(self):
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        for slot in range(self.concurrency):
+            worker = self._workers.get(slot)
+            if worker is None or worker.done():
+                lowest = PRIORITY_CONFIRM if slot < self.reserved else PRIORITY_ROUTINE
+                # A fresh context, so workers don't inherit the deadline (or trace)
+                # of whichever caller happened to start them
+                self._workers[slot] = asyncio.create_task(self._worker(lowest), name=f"fetch-worker-{slot}",
+                                                          context=contextvars.Context())
+
+    async def fetch(self, username, priority=PRIORITY_ROUTINE, guild_id=None, budget=None):
+        """Look username up through the queue.
+
+        Interactive callers are bounded by their current deadline, queue time
+        included. Background polls pass `budget` instead: seconds the lookup
+        may take once a worker starts it, however long it queued.
+        """
+        key = username.lstrip('@').lower()
+        deadline = current_deadline.get()
+        job = self.pending.get(key)
+        if job is not None and job.priority <= priority:
+            job.widen(deadline, budget)
+        else:
+            self._start()
+            job = FetchJob(key, priority, guild_id, asyncio.get_running_loop().create_future(),
+                           deadline, budget, current_trace.get())
+            # Start-time fair queuing: a guild's next job is tagged after its
+            # previous one, spaced by 1/weight, so heavy guilds queue behind
+            # their own backlog instead of everyone else's
+            start = max(self.virtual_time[priority], self.guild_finish[priority].get(guild_id, 0.0))
+            finish = start + 1.0 / self.weights.get(guild_id, 1.0)
+            self.guild_finish[priority][guild_id] = finish
+            heapq.heappush(self.queues[priority], (finish, next(self._seq), job))
+            self.pending[key] = job
+            async with self._changed:
+                self._changed.notify_all()
+        # Shield so a cancelled caller doesn't cancel a lookup others share
+        return await within_budget(asyncio.shield(job.future), "fetch:queue")
+
+    def _has_work(self, lowest):
+        return any(self.queues[priority] for priority in range(lowest + 1))
+
+    def _pop(self, lowest=PRIORITY_ROUTINE):
+        for priority, heap in enumerate(self.queues[:lowest + 1]):
+            if heap:
+                finish, _, job = heapq.heappop(heap)
+                self.virtual_time[priority] = finish
+                return job
+        return None
+
+    async def _worker(self, lowest):
+        """Serve jobs of priority `lowest` or better"""
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self._has_work(lowest))
+                job = self._pop(lowest)
+            now = time.monotonic()
+            self.waits[job.priority].append(now - job.enqueued)
+            if job.expired(now):
+                # Every caller has already given up; don't spend a request on it
+                if not job.future.done():
+                    job.future.set_exception(overrun("fetch:queue"))
+                    job.future.exception()
+                if self.pending.get(job.username) is job:
+                    del self.pending[job.username]
+                continue
+            self.served[job.priority] += 1
+            trace_token = current_trace.set(job.trace)
+            try:
+                deadline = job.deadline_from(now)
+                with deadline_scope(None if deadline is None else deadline - now):
+                    result = await get_instagram_data(job.username)
+                if not job.future.done():
+                    job.future.set_result(result)
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+                    job.future.exception()  # mark retrieved; callers re-raise it themselves
+            finally:
+                current_trace.reset(trace_token)
+                if self.pending.get(job.username) is job:
+                    del self.pending[job.username]
+
+    async def drain(self, timeout):
+        """Drop queued routine polls and wait for everything else to finish"""
+        for _, _, job in self.queues[PRIORITY_ROUTINE]:
+            job.future.cancel()
+            if self.pending.get(job.username) is job:
+                del self.pending[job.username]
+        self.queues[PRIORITY_ROUTINE].clear()
+        futures = [job.future for job in self.pending.values()]
+        if futures:
+            await asyncio.wait_for(asyncio.gather(*futures, return_exceptions=True), timeout)
+
+    def stats(self):
+        result = {}
+        for priority, name in enumerate(PRIORITY_NAMES):
+            waits = sorted(self.waits[priority])
+            def pct(q):
+                return waits[min(len(waits) - 1, int(q * len(waits)))] * 1000 if waits else 0.0
+            result[name] = {'queued': len(self.queues[priority]), 'served': self.served[priority],
+                            'p50_ms': pct(0.50), 'p99_ms': pct(0.99)}
+        return result
+
+def parse_guild_weights(spec):
+    weights = {}
+    for item in re.split(r'[\s,]+', spec):
+        guild, _, weight = item.partition(':')
+        try:
+            weights[int(guild)] = float(weight)
+        except ValueError:
+            if item:
+                logger.error(f"Invalid GUILD_WEIGHTS entry: {item}")
+    return weights
+
+fetch_scheduler = FetchScheduler(weights=parse_guild_weights(GUILD_WEIGHTS))
+
 # Helper function to create animated loading
 async def animate_loading(message, username):
     loading_frames = ["⏳", "⏰", "⏱️", "⏲️"]
-    for i in range(3):
-        embed = discord.Embed(
-            title=f"{loading_frames[i]} Fetching Instagram Data...",
-            description=f"Searching for @{username}",
-            color=COLORS['warning']
-        )
-        embed.set_footer(text="Please wait...", icon_url=bot.user.avatar.url if bot.user.avatar else None)
-        await message.edit(embed=embed)
-        await asyncio.sleep(0.5)
+    with trace_span("animate_loading"):
+        for i in range(3):
+            embed = discord.Embed(
+                title=f"{loading_frames[i]} Fetching Instagram Data...",
+                description=f"Searching for @{username}",
+                color=COLORS['warning']
+            )
+            embed.set_footer(text="Please wait...", icon_url=bot.user.avatar.url if bot.user.avatar else None)
+            await message.edit(embed=embed)
+            await asyncio.sleep(0.5)
 
 # Helper function to get status emoji based on follower count
 def get_status_emoji(followers_str):
@@ -390,36 +1790,1014 @@ def fetch_instagram_selenium(username):
     except Exception as e:
         return {'error': f'Selenium method failed: {e}'}
 
+# --- Watch list and multi-instance coordination ---
+# Watched accounts live in a shared store and are split into partitions by a
+# stable hash. Each instance holds time-limited leases on a fair share of the
+# partitions and only polls accounts in partitions it currently owns, so
+# running N copies gives N times the polling capacity without duplicate
+# alerts. One extra lease picks the instance that answers commands.
+COORD_BACKEND = get_setting('COORD_BACKEND', 'sqlite')
+COORD_DB_PATH = get_setting('COORD_DB_PATH', 'coordination.sqlite3')
+COORD_PARTITIONS = get_setting('COORD_PARTITIONS', 16, int)
+LEASE_TTL = get_setting('LEASE_TTL', 30, float)
+POLL_INTERVAL = get_setting('POLL_INTERVAL', 300, float)
+# Stable across restarts, so a crash-restarted copy renews its own leases at
+# once instead of waiting for them to expire; copies sharing a host need
+# their own INSTANCE_ID
+INSTANCE_ID = get_setting('INSTANCE_ID', socket.gethostname())
+LEADER_PARTITION = -1
+
+class CoordinationStore:
+    """Backend interface for shared leases and the watch list.
+
+    Methods are blocking; the coordinator calls them from a worker thread.
+    Timestamps are wall-clock seconds, so hosts sharing a store need roughly
+    synchronised clocks (well within LEASE_TTL).
+    """
+
+    def heartbeat(self, owner, ttl):
+        raise NotImplementedError
+
+    def live_instances(self):
+        raise NotImplementedError
+
+    def try_acquire(self, partition, owner, ttl):
+        raise NotImplementedError
+
+    def release(self, partition, owner):
+        raise NotImplementedError
+
+    def add_watch(self, watch):
+        raise NotImplementedError
+
+    def remove_watch(self, username):
+        raise NotImplementedError
+
+    def get_watch(self, username):
+        raise NotImplementedError
+
+    def watches(self, partitions):
+        raise NotImplementedError
+
+class SQLiteCoordinationStore(CoordinationStore):
+    """Default backend: one SQLite file, which may sit on a shared volume"""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        # Rollback journal rather than WAL: WAL is unsafe on network filesystems
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS leases (
+                partition INTEGER PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS instances (
+                owner TEXT PRIMARY KEY, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS watches (
+                username TEXT PRIMARY KEY, mode TEXT NOT NULL, partition INTEGER NOT NULL,
+                guild_id INTEGER, channel_id INTEGER, started_at REAL NOT NULL, followers INTEGER);
+            CREATE INDEX IF NOT EXISTS watches_partition ON watches (partition);
+        """)
+
+    def _transaction(self, statements):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def heartbeat(self, owner, ttl):
+        now = time.time()
+        def statements(conn):
+            conn.execute("INSERT OR REPLACE INTO instances VALUES (?, ?)", (owner, now + ttl))
+            conn.execute("DELETE FROM instances WHERE expires_at < ?", (now,))
+        self._transaction(statements)
+
+    def live_instances(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM instances WHERE expires_at >= ?",
+                                      (time.time(),)).fetchone()[0]
+
+    def try_acquire(self, partition, owner, ttl):
+        now = time.time()
+        def statements(conn):
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE partition = ?", (partition,)).fetchone()
+            if row is not None and row[0] != owner and row[1] >= now:
+                return False
+            conn.execute("INSERT OR REPLACE INTO leases VALUES (?, ?, ?)", (partition, owner, now + ttl))
+            return True
+        return self._transaction(statements)
+
+    def release(self, partition, owner):
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE partition = ? AND owner = ?", (partition, owner))
+
+    def add_watch(self, watch):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watches VALUES (:username, :mode, :partition, :guild_id, "
+                ":channel_id, :started_at, :followers)", watch)
+
+    def remove_watch(self, username):
+        with self._lock:
+            self._conn.execute("DELETE FROM watches WHERE username = ?", (username,))
+
+    def get_watch(self, username):
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM watches WHERE username = ?", (username,))
+            row = cursor.fetchone()
+            return dict(zip([c[0] for c in cursor.description], row)) if row else None
+
+    def watches(self, partitions):
+        partitions = list(partitions)
+        if not partitions:
+            return []
+        placeholders = ','.join('?' * len(partitions))
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT * FROM watches WHERE partition IN ({placeholders})", partitions)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+COORD_BACKENDS = {
+    'sqlite': SQLiteCoordinationStore,
+}
+
+class Coordinator:
+    """Keeps this instance's leases renewed and balanced against its peers"""
+
+    def __init__(self, store, owner=INSTANCE_ID, partitions=COORD_PARTITIONS, ttl=LEASE_TTL):
+        self.store = store
+        self.owner = owner
+        self.partitions = partitions
+        self.ttl = ttl
+        self.owned = {}  # partition -> local monotonic deadline
+
+    def partition_for(self, username):
+        # crc32 rather than hash(): it must agree across processes
+        return zlib.crc32(username.lower().encode('utf-8')) % self.partitions
+
+    def owns(self, partition):
+        return self.owned.get(partition, 0) > time.monotonic()
+
+    @property
+    def is_leader(self):
+        return self.owns(LEADER_PARTITION)
+
+    def owned_partitions(self):
+        return [p for p in self.owned if p != LEADER_PARTITION and self.owns(p)]
+
+    async def _acquire(self, partition):
+        started = time.monotonic()
+        if await asyncio.to_thread(self.store.try_acquire, partition, self.owner, self.ttl):
+            # Treat the lease as ours for a little less than its TTL to leave
+            # slack for clock skew and a slow store
+            self.owned[partition] = started + self.ttl * 0.8
+            return True
+        self.owned.pop(partition, None)
+        return False
+
+    async def rebalance(self):
+        await asyncio.to_thread(self.store.heartbeat, self.owner, self.ttl)
+        live = max(1, await asyncio.to_thread(self.store.live_instances))
+        target = math.ceil(self.partitions / live)
+
+        for partition in list(self.owned):
+            await self._acquire(partition)
+        mine = self.owned_partitions()
+        for partition in mine[target:]:
+            # Hand surplus partitions back so a newly started peer can take them
+            self.owned.pop(partition, None)
+            await asyncio.to_thread(self.store.release, partition, self.owner)
+        free = [p for p in range(self.partitions) if not self.owns(p)]
+        random.shuffle(free)
+        for partition in free:
+            if len(self.owned_partitions()) >= target:
+                break
+            await self._acquire(partition)
+        if not self.is_leader:
+            await self._acquire(LEADER_PARTITION)
+
+    async def run(self):
+        while True:
+            try:
+                await self.rebalance()
+            except Exception as e:
+                logger.error(f"Lease rebalance failed: {e}")
+            await asyncio.sleep(self.ttl / 3)
+
+    def release_all(self):
+        for partition in list(self.owned):
+            self.store.release(partition, self.owner)
+        self.owned.clear()
+
+    async def watch(self, username, mode, channel_id=None, guild_id=None, followers=None, started_at=None):
+        username = username.lstrip('@').lower()
+        with trace_span("watch_list:add"):
+            await asyncio.to_thread(self.store.add_watch, {
+                'username': username, 'mode': mode, 'partition': self.partition_for(username),
+                'guild_id': guild_id, 'channel_id': channel_id, 'started_at': started_at or time.time(),
+                'followers': followers,
+            })
+
+    async def unwatch(self, username):
+        await asyncio.to_thread(self.store.remove_watch, username.lstrip('@').lower())
+
+coordinator = Coordinator(COORD_BACKENDS[COORD_BACKEND](COORD_DB_PATH))
+background_tasks = set()
+
+def start_background_task(coro, name):
+    task = asyncio.create_task(coro, name=name)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+def format_duration(seconds):
+    """Format seconds like '2 hours, 5 minutes, 1 second'"""
+    seconds = max(0, int(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours} hour{'s' if hours != 1 else ''}, {minutes} minute{'s' if minutes != 1 else ''}, {seconds} second{'s' if seconds != 1 else ''}"
+
+# --- Monitoring sessions ---
+# !monitorban/!monitorunban open a session holding the start time and the
+# latest profile snapshot; the watch-list poller keeps the snapshot fresh and
+# !bandone/!unbandone (or the poller's own alert) close it, so completion
+# reports real elapsed times without another Instagram request. Sessions are
+# charged to the shared memory budget but never evicted: they are small and
+# closing them is up to the user.
+class MonitoringSession:
+    """One monitoring run, from its start command until it is completed"""
+    __slots__ = ('username', 'mode', 'started_at', 'snapshot', 'snapshot_at', 'size')
+
+    def __init__(self, username, mode, started_at, snapshot=None, snapshot_at=None):
+        self.username = username
+        self.mode = mode
+        self.started_at = started_at  # wall clock, comparable with the watch list
+        self.snapshot = snapshot  # ProfileRecord, or None if nothing real was fetched
+        self.snapshot_at = snapshot_at
+        self.size = 0
+
+    @property
+    def followers(self):
+        return self.snapshot.followers if self.snapshot is not None and self.snapshot.followers is not None else 0
+
+    def elapsed(self):
+        return time.time() - self.started_at
+
+    def approx_size(self):
+        return sys.getsizeof(self) + (self.snapshot.approx_size() if self.snapshot is not None else 0)
+
+monitoring_sessions = {}  # username -> MonitoringSession
+
+def _store_session(session):
+    previous = monitoring_sessions.pop(session.username, None)
+    if previous is not None:
+        memory_budget.release(previous.size)
+    session.size = session.approx_size()
+    memory_budget.reserve(session.size)
+    monitoring_sessions[session.username] = session
+    return session
+
+def start_session(username, mode, data):
+    """Open (or restart) the session for username with the profile just fetched"""
+    snapshot = None if data.get('fallback') else ProfileRecord.from_dict(data)
+    now = time.time()
+    return _store_session(MonitoringSession(username.lstrip('@').lower(), mode, now, snapshot, now if snapshot else None))
+
+def refresh_session(username, data):
+    """Replace the session snapshot with a newer successful lookup"""
+    session = monitoring_sessions.get(username.lstrip('@').lower())
+    if session is None or data.get('fallback'):
+        return
+    # A rounded count ('12.5K') is no update on an exact one
+    if data.get('approximate') and session.snapshot is not None and not session.snapshot.approximate:
+        return
+    memory_budget.release(session.size)
+    session.snapshot = ProfileRecord.from_dict(data)
+    session.snapshot_at = time.time()
+    session.size = session.approx_size()
+    memory_budget.reserve(session.size)
+
+async def end_session(username):
+    """Close the session for username and take it off the watch list.
+
+    Sessions started on another instance, or before a cold restart, are
+    rebuilt from the shared watch list (start time and follower count).
+    Returns None when the account was never being monitored.
+    """
+    key = username.lstrip('@').lower()
+    session = monitoring_sessions.pop(key, None)
+    if session is not None:
+        memory_budget.release(session.size)
+    else:
+        watch = await asyncio.to_thread(coordinator.store.get_watch, key)
+        if watch is not None:
+            snapshot = ProfileRecord(key, None, None, watch['followers'], None, None) if watch['followers'] is not None else None
+            session = MonitoringSession(key, watch['mode'], watch['started_at'], snapshot)
+    await coordinator.unwatch(key)
+    return session
+
+async def check_account_status(username, priority=PRIORITY_ROUTINE, guild_id=None, budget=None):
+    """Return 'active', 'missing' or None when the lookup was inconclusive"""
+    data = await fetch_scheduler.fetch(username, priority, guild_id, budget)
+    if not data.get('fallback'):
+        return 'active', data
+    if data.get('not_found'):
+        return 'missing', data
+    return None, data
+
+async def poll_watch(watch):
+    # The whole watch list is queued at once, so each lookup's budget starts
+    # when a worker picks it up rather than when it was queued
+    status, data = await check_account_status(watch['username'], PRIORITY_ROUTINE, watch.get('guild_id'), POLL_DEADLINE)
+    if status == 'active':
+        refresh_session(watch['username'], data)
+    # Rounded counts would show up as fake deltas next to exact ones
+    if ANOMALY_DETECTION and status == 'active' and not data.get('approximate'):
+        get_follower_history().observe(watch['username'], data['followers'], data['following'], data['posts'])
+    expected = 'missing' if watch['mode'] == 'ban' else 'active'
+    if status != expected:
+        return
+    # Confirm the flip with a fresh, higher-priority lookup before alerting
+    profile_cache.pop(watch['username'])
+    status, data = await check_account_status(watch['username'], PRIORITY_CONFIRM, watch.get('guild_id'), POLL_DEADLINE)
+    if status != expected:
+        return
+    event = watch['mode']
+    # Fencing: our lease may have lapsed while the lookup was in flight
+    if not coordinator.owns(watch['partition']):
+        return
+    session = await end_session(watch['username'])
+    await announce_watch_result(watch, event, data, session)
+
+async def announce_watch_result(watch, event, data, session=None):
+    username = watch['username']
+    elapsed = format_duration(time.time() - watch['started_at'])
+    if event == 'unban':
+        followers = data.get('followers', 0)
+    else:
+        # Last count seen while the account was still up
+        followers = session.followers if session is not None else (watch.get('followers') or 0)
+    if event == 'ban':
+        description = (
+            f"🔥Account Status: @{username} has been banned\n"
+            f"👥 Followers: {followers:,}\n"
+            f"⏱ Time alive: {elapsed}"
+        )
+        title, color = "🚫 Account Banned", COLORS['danger']
+    else:
+        description = (
+            f"✅ Monitoring Status: @{username} has been unbanned\n"
+            f"👥 Followers: {followers:,}\n"
+            f"⏱ Time taken: {elapsed}"
+        )
+        title, color = "✅ Account Unbanned", COLORS['success']
+    summary = f"{'🚫' if event == 'ban' else '✅'} @{username} {event}ned • 👥 {followers:,} • ⏱ {elapsed}"
+    if watch.get('channel_id'):
+        channel_digest.offer(watch['channel_id'], (event, color, description, summary))
+    notify(event, f"<b>{title}</b>\n{description}\n<b>Time:</b> {datetime.now().strftime('%H:%M:%S')}", summary)
+
+async def post_channel_alerts(channel_id, items):
+    """Post one embed per alert, or a single digest embed for a batch"""
+    if len(items) == 1:
+        _, color, description, _ = items[0]
+        embed = discord.Embed(description=description, color=color, timestamp=datetime.utcnow())
+    else:
+        bans = sum(1 for item in items if item[0] == 'ban')
+        title = f"📦 Alert Digest: {bans} banned, {len(items) - bans} unbanned"
+        embed = discord.Embed(title=title, description=format_digest('', [item[3] for item in items]).lstrip('\n'),
+                              color=COLORS['danger'] if bans else COLORS['success'], timestamp=datetime.utcnow())
+    embed.set_footer(text="Instagram Monitor Bot", icon_url=bot.user.avatar.url if bot.user and bot.user.avatar else None)
+    try:
+        channel = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+        await channel.send(embed=embed)
+    except Exception as e:
+        logger.error(f"Could not post {len(items)} alert(s) to channel {channel_id}: {e}")
+
+channel_digest = AlertDigest(post_channel_alerts)
+
+# --- Follower-history anomaly detection ---
+# Sharp follower drops or frozen post counts often come before a ban. Recent
+# observations for every watched account are kept in one columnar NumPy
+# array (accounts x metrics x window) so each tick scores all accounts in a
+# handful of vectorised operations. Flagged accounts are re-polled on a
+# faster cadence. numpy is only imported once the feature is enabled.
+ANOMALY_DETECTION = get_setting('ANOMALY_DETECTION', False, bool)
+ANOMALY_WINDOW = get_setting('ANOMALY_WINDOW', 32, int)
+ANOMALY_MIN_OBSERVATIONS = get_setting('ANOMALY_MIN_OBSERVATIONS', 8, int)
+ANOMALY_Z = get_setting('ANOMALY_Z', 3.0, float)
+ANOMALY_SLOPE_DROP = get_setting('ANOMALY_SLOPE_DROP', 0.01, float)
+ANOMALY_FROZEN_DECLINE = get_setting('ANOMALY_FROZEN_DECLINE', 0.01, float)  # share of followers lost over the recent half window
+ANOMALY_MIN_SPREAD = get_setting('ANOMALY_MIN_SPREAD', 0.001, float)  # noise floor, as a share of followers (at least 1)
+ANOMALY_REPOLL_INTERVAL = get_setting('ANOMALY_REPOLL_INTERVAL', 60, float)
+ANOMALY_ALERTS = get_setting('ANOMALY_ALERTS', False, bool)
+
+class FollowerHistory:
+    """Columnar ring of recent follower/following/post counts per account"""
+    METRICS = ('followers', 'following', 'posts')
+
+    def __init__(self, window=ANOMALY_WINDOW, budget=memory_budget):
+        import numpy as np
+        self.np = np
+        self.window = window
+        self.budget = budget
+        self.rows = {}  # username -> row index
+        self.usernames = []
+        self.free = []
+        self.data = np.full((0, len(self.METRICS), window), np.nan)
+        self.updated = np.zeros(0)
+        self.bytes_used = 0
+        budget.register(self)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def evict_one(self):
+        # Rows live in one preallocated array, so dropping one frees nothing;
+        # the budget is respected by refusing to grow instead (see _allocate)
+        return False
+
+    def _allocate(self, username):
+        np = self.np
+        if not self.free:
+            capacity = len(self.usernames)
+            new_capacity = max(16, capacity * 2)
+            extra = (new_capacity - capacity) * (len(self.METRICS) * self.window + 1) * 8
+            if capacity and self.budget.used_bytes + extra > self.budget.limit_bytes:
+                # Out of budget: recycle the least recently updated account
+                self.drop(self.usernames[int(np.argmin(np.where(self.updated > 0, self.updated, np.inf)))])
+            else:
+                data = np.full((new_capacity, len(self.METRICS), self.window), np.nan)
+                data[:capacity] = self.data
+                updated = np.zeros(new_capacity)
+                updated[:capacity] = self.updated
+                self.data, self.updated = data, updated
+                self.usernames.extend([None] * (new_capacity - capacity))
+                self.free.extend(range(new_capacity - 1, capacity - 1, -1))
+                self.bytes_used += extra
+                self.budget.reserve(extra)
+        row = self.free.pop()
+        self.rows[username] = row
+        self.usernames[row] = username
+        return row
+
+    def observe(self, username, followers, following, posts):
+        row = self.rows.get(username)
+        if row is None:
+            row = self._allocate(username)
+        series = self.data[row]
+        series[:, :-1] = series[:, 1:]
+        series[:, -1] = (followers, following, posts)
+        self.updated[row] = time.monotonic()
+
+    def drop(self, username):
+        row = self.rows.pop(username, None)
+        if row is not None:
+            self.data[row] = self.np.nan
+            self.updated[row] = 0
+            self.usernames[row] = None
+            self.free.append(row)
+
+    def retain(self, usernames):
+        for username in [u for u in self.rows if u not in usernames]:
+            self.drop(username)
+
+    def _slopes(self, y):
+        """Least-squares slope of every row of y, ignoring NaNs"""
+        np = self.np
+        x = np.broadcast_to(np.arange(y.shape[1], dtype=float), y.shape)
+        mask = ~np.isnan(y)
+        n = mask.sum(axis=1)
+        xbar = np.where(mask, x, 0).sum(axis=1) / n
+        ybar = np.where(mask, y, 0).sum(axis=1) / n
+        dx = np.where(mask, x - xbar[:, None], 0)
+        dy = np.where(mask, y - ybar[:, None], 0)
+        return (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+
+    def analyze(self):
+        """Score every account at once; returns {username: [reasons]} for outliers"""
+        np = self.np
+        if not self.rows:
+            return {}
+        followers, posts = self.data[:, 0, :], self.data[:, 2, :]
+        half = self.window // 2
+        with warnings.catch_warnings(), np.errstate(all='ignore'):
+            warnings.simplefilter('ignore', RuntimeWarning)
+            observed = (~np.isnan(followers)).sum(axis=1)
+            deltas = np.diff(followers, axis=1)
+            latest, previous = deltas[:, -1], deltas[:, :-1]
+            level = np.nanmean(followers, axis=1)
+            # Quiet accounts are often exactly flat between polls; a zero
+            # spread must not hide the first sharp drop after them
+            spread = np.maximum(np.nanstd(previous, axis=1), np.maximum(1.0, ANOMALY_MIN_SPREAD * level))
+            z = (latest - np.nanmean(previous, axis=1)) / spread
+            recent_slope = self._slopes(followers[:, half:])
+            slope_change = (recent_slope - self._slopes(followers[:, :half])) / np.where(level > 0, level, np.nan)
+            # Unchanged posts alone describe most quiet accounts; it only counts
+            # alongside a real follower decline, one that is a meaningful share
+            # of the audience and well outside the poll-to-poll noise
+            recent_loss = -recent_slope * (self.window - half)
+            declining = (recent_loss >= ANOMALY_FROZEN_DECLINE * level) & (recent_loss >= ANOMALY_Z * spread)
+            frozen = (np.nanmax(posts, axis=1) == np.nanmin(posts, axis=1)) & declining
+        ready = observed >= ANOMALY_MIN_OBSERVATIONS
+        # The frozen check needs the recent half of the window filled in
+        frozen_ready = observed >= max(ANOMALY_MIN_OBSERVATIONS, self.window - half)
+        checks = {
+            'follower drop': ready & (z <= -ANOMALY_Z),
+            'slope change': ready & (slope_change <= -ANOMALY_SLOPE_DROP),
+            'frozen posts': frozen_ready & frozen,
+        }
+        flagged = {}
+        for reason, mask in checks.items():
+            for row in np.flatnonzero(mask):
+                username = self.usernames[row]
+                if username is not None:
+                    flagged.setdefault(username, []).append(reason)
+        return flagged
+
+follower_history = None
+anomaly_flags = {}  # username -> reasons, refreshed every analytics pass
+
+def get_follower_history():
+    global follower_history
+    if follower_history is None:
+        follower_history = FollowerHistory()
+    return follower_history
+
+def run_anomaly_pass(watched):
+    """Score all watched accounts, refresh the fast re-poll set and alert on new outliers"""
+    history = get_follower_history()
+    history.retain(watched)
+    flagged = history.analyze()
+    for username, reasons in flagged.items():
+        if username in anomaly_flags:
+            continue
+        logger.warning(f"Anomaly on @{username}: {', '.join(reasons)}",
+                       extra={'username': username, 'outcome': 'anomaly', 'reasons': reasons})
+        if ANOMALY_ALERTS:
+            notify('anomaly', f"<b>📉 Anomaly Detected</b>\n"
+                              f"<b>Account:</b> @{username}\n"
+                              f"<b>Signals:</b> {', '.join(reasons)}\n"
+                              f"<b>Time:</b> {datetime.now().strftime('%H:%M:%S')}")
+    anomaly_flags.clear()
+    anomaly_flags.update(flagged)
+
+poll_state = {'next_full_poll': 0.0}  # monotonic deadline; carried across restarts by the snapshot
+
+async def poll_watch_list():
+    """Background loop: re-check every watched account in the partitions we own.
+
+    With anomaly detection on, the loop ticks every ANOMALY_REPOLL_INTERVAL:
+    flagged accounts are re-polled on every tick, everything else once per
+    POLL_INTERVAL.
+    """
+    tick = min(POLL_INTERVAL, ANOMALY_REPOLL_INTERVAL) if ANOMALY_DETECTION else POLL_INTERVAL
+    while True:
+        started = time.monotonic()
+        try:
+            full_poll = started >= poll_state['next_full_poll']
+            if full_poll:
+                poll_state['next_full_poll'] = started + POLL_INTERVAL
+            watches = await asyncio.to_thread(coordinator.store.watches, coordinator.owned_partitions())
+            due = [w for w in watches if full_poll or w['username'] in anomaly_flags]
+            # The fetch scheduler bounds concurrency, so these can all be queued at once
+            results = await asyncio.gather(*(poll_watch(w) for w in due if coordinator.owns(w['partition'])),
+                                           return_exceptions=True)
+            for result in results:
+                # Overruns are already counted; they get retried next poll
+                if isinstance(result, Exception) and not isinstance(result, DeadlineExceeded):
+                    logger.error(f"Watch poll failed: {result}")
+            if ANOMALY_DETECTION and due:
+                run_anomaly_pass({w['username'] for w in watches})
+        except Exception as e:
+            logger.error(f"Watch list poll failed: {e}")
+        await asyncio.sleep(max(1.0, tick - (time.monotonic() - started)))
+
+# --- On-demand profiling and per-command tracing ---
+PROFILE_MAX_SECONDS = get_setting('PROFILE_MAX_SECONDS', 60, int)
+PROFILE_INTERVAL = get_setting('PROFILE_INTERVAL', 0.005, float)
+
+class StackSampler:
+    """Samples the stacks of every thread from a background thread.
+
+    Costs one sys._current_frames() call per interval and nothing on the
+    profiled threads themselves, so it is safe to run in production.
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.samples[tuple(reversed(stack))] += 1
+        self.sample_count += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        """Stacks in the folded format understood by flamegraph.pl and speedscope"""
+        return '\n'.join(f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common())
+
+    def hotspots(self, top=20):
+        self_counts, total_counts = Counter(), Counter()
+        for stack, count in self.samples.items():
+            self_counts[stack[-1]] += count
+            for frame in set(stack[1:]):
+                total_counts[frame] += count
+        total = sum(self.samples.values()) or 1
+        lines = [f"{'self%':>6} {'total%':>7}  frame"]
+        for frame, count in self_counts.most_common(top):
+            lines.append(f"{100 * count / total:6.1f} {100 * total_counts[frame] / total:7.1f}  {frame}")
+        return '\n'.join(lines)
+
+async def measure_loop_lag(stop, probe=0.05):
+    """Record how late the event loop wakes us up while profiling runs"""
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(probe)
+        lags.append(time.perf_counter() - started - probe)
+    return lags
+
+profile_lock = asyncio.Lock()
+
+# Per-command tracing: spans are only recorded while a trace is active in the
+# current task, so the hooks cost a context-variable lookup otherwise.
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+@contextmanager
+def trace_span(name):
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    depth = trace['depth']
+    started = time.perf_counter()
+    trace['depth'] += 1
+    try:
+        yield
+    finally:
+        trace['depth'] = depth
+        trace['spans'].append((started - trace['started'], time.perf_counter() - started, depth, name))
+
+def format_trace(trace):
+    lines = [f"{'start ms':>9} {'dur ms':>9}  span"]
+    for offset, duration, depth, name in sorted(trace['spans']):
+        lines.append(f"{offset * 1000:9.1f} {duration * 1000:9.1f}  {'  ' * depth}{name}")
+    lines.append(f"{'':>9} {(time.perf_counter() - trace['started']) * 1000:9.1f}  total")
+    return '\n'.join(lines)
+
+# --- Deadline budgets ---
+# Every command runs under a deadline that the scheduler queue, the fetch
+# chain and the proxy rate limiter all draw from; watch-list lookups get
+# POLL_DEADLINE from the moment a fetch worker starts them.
+# Work that cannot finish in the time left is skipped up front (a proxy in a
+# long cooldown, Instaloader with seconds to spare) or cut off, and each
+# skip or cut-off is counted per stage in deadline_overruns.
+COMMAND_DEADLINE = get_setting('COMMAND_DEADLINE', 25, float)
+POLL_DEADLINE = get_setting('POLL_DEADLINE', 60, float)
+current_deadline = contextvars.ContextVar('current_deadline', default=None)
+deadline_overruns = Counter()  # stage -> times work was skipped or cut off
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The caller's budget ran out before this stage could finish"""
+
+    def __init__(self, stage):
+        super().__init__(f"deadline exceeded at {stage}")
+        self.stage = stage
+
+def overrun(stage):
+    deadline_overruns[stage] += 1
+    logger.info("Deadline exceeded at %s", stage, extra={'outcome': 'deadline', 'stage': stage})
+    return DeadlineExceeded(stage)
+
+def push_deadline(seconds):
+    """Allow `seconds` more (never more than an enclosing deadline); returns a reset token"""
+    deadline = None if seconds is None else time.monotonic() + seconds
+    outer = current_deadline.get()
+    if outer is not None:
+        deadline = outer if deadline is None else min(deadline, outer)
+    return current_deadline.set(deadline)
+
+@contextmanager
+def deadline_scope(seconds):
+    token = push_deadline(seconds)
+    try:
+        yield current_deadline.get()
+    finally:
+        current_deadline.reset(token)
+
+def remaining_budget():
+    """Seconds left before the current deadline, or None when unbounded"""
+    deadline = current_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+async def within_budget(awaitable, stage, minimum=0.0):
+    """Await with whatever budget is left; skip it if no more than `minimum` seconds remain"""
+    remaining = remaining_budget()
+    if remaining is None:
+        return await awaitable
+    if remaining <= minimum:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise overrun(stage)
+    try:
+        return await asyncio.wait_for(awaitable, remaining)
+    except DeadlineExceeded:
+        raise
+    except asyncio.TimeoutError:
+        # The awaitable may have timed out on its own terms with budget to spare
+        if remaining_budget() > 0:
+            raise
+        raise overrun(stage) from None
+
+# Commands opt out (e.g. !profile, which runs for as long as asked) with
+# extras={'deadline': None} on the decorator
+@bot.before_invoke
+async def start_command_deadline(ctx):
+    seconds = ctx.command.extras.get('deadline', COMMAND_DEADLINE)
+    if seconds is not None:
+        ctx.deadline_token = push_deadline(seconds)
+
+@bot.after_invoke
+async def finish_command_deadline(ctx):
+    token = getattr(ctx, 'deadline_token', None)
+    if token is None:
+        return
+    if remaining_budget() < 0:
+        overrun(f"command:{ctx.command.name}")
+    current_deadline.reset(token)
+
+def unwrap_command_error(error):
+    """Dig the original exception out of (hybrid) command invoke wrappers"""
+    while getattr(error, 'original', None) is not None:
+        error = error.original
+    return error
+
+# --- Graceful shutdown and warm restart ---
+SHUTDOWN_DEADLINE = get_setting('SHUTDOWN_DEADLINE', 20, float)
+SNAPSHOT_PATH = get_setting('SNAPSHOT_PATH', 'state_snapshot.json.gz', keep_empty=True)
+SNAPSHOT_MAX_AGE = get_setting('SNAPSHOT_MAX_AGE', 3600, float)
+shutting_down = False
+# Set once setup_hook has had its chance to load the snapshot; a start that
+# failed before then (bad token, no network) must not overwrite the file
+# with empty state
+snapshot_loaded = False
+
+def build_snapshot():
+    """Collect the state worth keeping across a restart as plain JSON data"""
+    now = time.monotonic()
+    snapshot = {
+        'version': 1,
+        'written_at': time.time(),
+        'profiles': [
+            [key, [getattr(record, field) for field in ProfileRecord.__slots__], now - stored_at]
+            for key, (stored_at, _, record) in profile_cache._entries.items()
+        ],
+        'method_health': method_health,
+        'next_full_poll_in': poll_state['next_full_poll'] - now,
+        'anomaly_flags': anomaly_flags,
+        'sessions': [
+            [m.username, m.mode, m.started_at, m.snapshot_at,
+             [getattr(m.snapshot, field) for field in ProfileRecord.__slots__] if m.snapshot is not None else None]
+            for m in monitoring_sessions.values()
+        ],
+    }
+    if proxy_pool is not None:
+        snapshot['proxies'] = {
+            p.name: {'score': p.score, 'cooldown': max(0.0, p.cooldown_until - now), 'consecutive_429': p.consecutive_429}
+            for p in proxy_pool.proxies
+        }
+    if follower_history is not None:
+        snapshot['follower_history'] = {
+            username: follower_history.data[row].tolist() for username, row in follower_history.rows.items()
+        }
+    return snapshot
+
+def write_snapshot(snapshot, path=SNAPSHOT_PATH):
+    tmp_path = path + '.tmp'
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(snapshot, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """Warm caches, proxy and method health and poll deadlines from the last shutdown"""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError) as e:
+        logger.error(f"Ignoring unreadable snapshot {path}: {e}")
+        return False
+    downtime = time.time() - snapshot.get('written_at', 0)
+    if snapshot.get('version') != 1 or downtime > SNAPSHOT_MAX_AGE:
+        logger.info(f"Snapshot {path} is stale or from another version, starting cold")
+        return False
+
+    now = time.monotonic()
+    for key, values, age in snapshot.get('profiles', []):
+        if profile_cache.ttl is None or age + downtime < profile_cache.ttl:
+            profile_cache.put(key, ProfileRecord(*values), age=age + downtime)
+    method_health.update(snapshot.get('method_health', {}))
+    poll_state['next_full_poll'] = now + max(0.0, snapshot.get('next_full_poll_in', 0) - downtime)
+    anomaly_flags.update(snapshot.get('anomaly_flags', {}))
+    for username, mode, started_at, snapshot_at, values in snapshot.get('sessions', []):
+        _store_session(MonitoringSession(username, mode, started_at,
+                                         ProfileRecord(*values) if values else None, snapshot_at))
+    if proxy_pool is not None:
+        saved = snapshot.get('proxies', {})
+        for proxy in proxy_pool.proxies:
+            state = saved.get(proxy.name)
+            if state:
+                proxy.score = state['score']
+                proxy.consecutive_429 = state['consecutive_429']
+                proxy.cooldown_until = now + max(0.0, state['cooldown'] - downtime)
+    if ANOMALY_DETECTION and snapshot.get('follower_history'):
+        history = get_follower_history()
+        for username, series in snapshot['follower_history'].items():
+            if len(series[0]) == history.window:
+                row = history._allocate(username)
+                history.data[row] = series
+                history.updated[row] = now
+    logger.info(f"Warm start from snapshot written {downtime:.0f}s ago "
+                f"({len(snapshot.get('profiles', []))} cached profiles)")
+    return True
+
+shutdown_task = None  # kept outside background_tasks so the drain can't cancel itself
+
+def request_shutdown():
+    """SIGTERM handler: close the bot once, from its own task"""
+    global shutdown_task
+    if shutdown_task is None:
+        shutdown_task = asyncio.create_task(bot.close(), name="shutdown")
+
+async def graceful_shutdown(deadline=SHUTDOWN_DEADLINE):
+    """Stop taking work, drain fetches and notifications, then snapshot state"""
+    global shutting_down
+    if shutting_down:
+        return
+    shutting_down = True
+    ends = time.monotonic() + deadline
+    logger.info(f"Draining work (deadline {deadline:.0f}s)...")
+
+    current = asyncio.current_task()
+    for task in list(background_tasks):
+        if task is not current:
+            task.cancel()
+    try:
+        await asyncio.to_thread(coordinator.release_all)
+    except Exception as e:
+        logger.error(f"Could not release leases: {e}")
+
+    try:
+        await fetch_scheduler.drain(max(0.0, ends - time.monotonic()))
+    except asyncio.TimeoutError:
+        logger.warning(f"Gave up on {len(fetch_scheduler.pending)} in-flight fetch(es) at the deadline")
+    try:
+        # Alerts held back for a digest go out now rather than being lost
+        await asyncio.wait_for(asyncio.gather(alert_digest.flush(), channel_digest.flush()),
+                               max(0.0, ends - time.monotonic()))
+    except asyncio.TimeoutError:
+        logger.warning("Alert digests not fully sent at the deadline")
+    try:
+        await notification_router.drain(max(0.0, ends - time.monotonic()))
+    except asyncio.TimeoutError:
+        logger.warning("Notification queues not empty at the deadline; the outbox will replay them")
+    if notification_router.outbox is not None:
+        await notification_router.outbox.close()
+
+    if snapshot_loaded:
+        try:
+            write_snapshot(build_snapshot())
+            logger.info(f"State snapshot written to {SNAPSHOT_PATH}")
+        except Exception as e:
+            logger.error(f"Could not write state snapshot: {e}")
+
+    for http in (session, notify_session):
+        if http is not None and not http.closed:
+            await http.close()
+    if proxy_pool is not None:
+        await proxy_pool.close()
+
+# --- Slash commands and gateway metrics ---
+APP_COMMANDS_HASH_PATH = get_setting('APP_COMMANDS_HASH_PATH', '.app_commands.sha256')
+gateway_events = Counter()
+
+@bot.event
+async def on_socket_event_type(event_type):
+    gateway_events[event_type] += 1
+
+async def leader_interaction_check(interaction):
+    # Interactions reach every connected instance; only the leader answers
+    return coordinator.is_leader and not shutting_down
+
+async def on_app_command_error(interaction, error):
+    if isinstance(error, app_commands.CheckFailure) and (not coordinator.is_leader or shutting_down):
+        return
+    logger.error(f"App command error in {interaction.command and interaction.command.name}: {error}")
+
+bot.tree.interaction_check = leader_interaction_check
+bot.tree.on_error = on_app_command_error
+
+async def sync_app_commands():
+    """Register slash commands with Discord, but only when their definitions changed"""
+    payload = json.dumps([command.to_dict() for command in bot.tree.get_commands()], sort_keys=True)
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    try:
+        with open(APP_COMMANDS_HASH_PATH, encoding='utf-8') as f:
+            if f.read().strip() == digest:
+                return
+    except FileNotFoundError:
+        pass
+    synced = await bot.tree.sync()
+    logger.info(f"Synced {len(synced)} slash command(s) with Discord")
+    with open(APP_COMMANDS_HASH_PATH, 'w', encoding='utf-8') as f:
+        f.write(digest)
+
+@bot.event
+async def setup_hook():
+    global snapshot_loaded
+    if SNAPSHOT_PATH:
+        load_snapshot()
+        snapshot_loaded = True
+    try:
+        # Termux and process managers stop us with SIGTERM; drain like Ctrl+C
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, request_shutdown)
+    except (NotImplementedError, RuntimeError):
+        pass
+    replayed = notification_router.replay()
+    if replayed:
+        logger.info(f"Replaying {replayed} undelivered notification(s) from the outbox")
+    try:
+        await sync_app_commands()
+    except Exception as e:
+        logger.error(f"Slash command sync failed: {e}")
+    await coordinator.rebalance()
+    start_background_task(coordinator.run(), "lease-coordinator")
+    start_background_task(poll_watch_list(), "watch-list-poller")
+
 @bot.event
 async def on_ready():
-    print("=" * 60)
-    print("🚀 INSTAGRAM MONITOR BOT STARTED SUCCESSFULLY!")
-    print("=" * 60)
-    print(f"🤖 Bot Name: {bot.user.name}")
-    print(f"🆔 Bot ID: {bot.user.id}")
-    print(f"📅 Created: {bot.user.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"🏠 Servers: {len(bot.guilds)}")
-    print(f"👥 Users: {len(bot.users)}")
-    print(f"⚡ Latency: {round(bot.latency * 1000)}ms")
-    print("=" * 60)
-    print("📋 Available Commands:")
-    print("  • !ping - Test bot connectivity")
-    print("  • !test - Test bot permissions")
-    print("  • !debug - Debug bot settings")
-    print("  • !commands - Show all commands")
-    print("  • !stats - Bot statistics")
-    print("  • !monitorban @username - Start ban monitoring")
-    print("  • !monitorunban @username - Start unban monitoring")
-    print("  • !bandone - Complete ban process")
-    print("  • !unbandone - Complete unban process")
-    print("=" * 60)
-    print("🎯 Bot is ready to monitor Instagram accounts!")
-    print("=" * 60)
-    print("💡 TROUBLESHOOTING:")
-    print("  • If bot doesn't respond, use !test to check permissions")
-    print("  • Use !debug to see bot configuration")
-    print("  • Make sure bot has 'Send Messages' and 'Embed Links' permissions")
-    print("=" * 60)
+    banner = [
+        "=" * 60,
+        "🚀 INSTAGRAM MONITOR BOT STARTED SUCCESSFULLY!",
+        "=" * 60,
+        f"🤖 Bot Name: {bot.user.name}",
+        f"🆔 Bot ID: {bot.user.id}",
+        f"📅 Created: {bot.user.created_at.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"🏠 Servers: {len(bot.guilds)}",
+        f"👥 Users: {len(bot.users)}",
+        f"⚡ Latency: {round(bot.latency * 1000)}ms",
+        "=" * 60,
+        "📋 Available Commands:",
+        "  • !ping - Test bot connectivity",
+        "  • !test - Test bot permissions",
+        "  • !debug - Debug bot settings",
+        "  • !commands - Show all commands",
+        "  • !stats - Bot statistics",
+        "  • !monitorban @username - Start ban monitoring",
+        "  • !monitorunban @username - Start unban monitoring",
+        "  • !bandone - Complete ban process",
+        "  • !unbandone - Complete unban process",
+        "=" * 60,
+        "🎯 Bot is ready to monitor Instagram accounts!",
+        "=" * 60,
+        "💡 TROUBLESHOOTING:",
+        "  • If bot doesn't respond, use !test to check permissions",
+        "  • Use !debug to see bot configuration",
+        "  • Make sure bot has 'Send Messages' and 'Embed Links' permissions",
+        "=" * 60,
+        f"⏱️ Startup: import {IMPORT_SECONDS * 1000:.0f}ms, ready {(time.perf_counter() - _BOOT_STARTED) * 1000:.0f}ms",
+        "=" * 60,
+    ]
+    logger.info("\n".join(banner), extra={'event': 'ready', 'import_ms': round(IMPORT_SECONDS * 1000)})
     await bot.change_presence(activity=discord.Game(name="!commands | Instagram Monitor"))
 
 # 1. !ping
@@ -444,19 +2822,73 @@ async def ping(ctx):
         f"<b>Latency:</b> <code>{latency}ms</code>\n"
         f"<b>Uptime:</b> <code>Online</code>"
     )
-    send_telegram_notification(telegram_message)
+    notify('ping', telegram_message)
 
 
 # --- Example Telegram Notification Command ---
 @bot.command(description="Send a test notification to Telegram")
 @has_permissions(administrator=True)
 async def telegram_notify(ctx, *, message: str):
-    success = send_telegram_notification(f"<b>Discord Bot Notification</b>\n{message}")
+    # requests is blocking; keep it off the event loop and inside the command's budget
+    success = await within_budget(asyncio.to_thread(send_telegram_notification, f"<b>Discord Bot Notification</b>\n{message}"),
+                                  "notify:telegram_notify")
     if success:
         await ctx.send(f"✅ Telegram notification sent!")
     else:
         await ctx.send(f"❌ Failed to send Telegram notification.")
 
+# --- Profiling Commands ---
+@bot.command(description="Sample the event loop and worker threads for a few seconds", extras={'deadline': None})
+@has_permissions(administrator=True)
+async def profile(ctx, seconds: int = 10):
+    seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+    if profile_lock.locked():
+        await ctx.send("⏳ A profile is already running, try again when it finishes.")
+        return
+    async with profile_lock:
+        await ctx.send(f"🔬 Profiling for `{seconds}s`...")
+        sampler = StackSampler()
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_loop_lag(stop))
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stop.set()
+            await asyncio.to_thread(sampler.stop)
+            lags = await lag_task
+
+    summary = (
+        f"Samples: {sampler.sample_count} every {sampler.interval * 1000:.0f}ms over {seconds}s\n"
+        f"Event loop lag: avg {1000 * sum(lags) / max(len(lags), 1):.1f}ms, max {1000 * max(lags, default=0):.1f}ms\n\n"
+        f"{sampler.hotspots()}"
+    )
+    files = [
+        discord.File(io.BytesIO(summary.encode('utf-8')), filename="profile_hotspots.txt"),
+        discord.File(io.BytesIO(sampler.collapsed().encode('utf-8')), filename="profile_collapsed.txt"),
+    ]
+    await ctx.send("📈 Profile complete: top hotspots and collapsed stacks attached.", files=files)
+
+@bot.command(description="Run a command with span tracing and report where its time went", extras={'deadline': None})
+@has_permissions(administrator=True)
+async def trace(ctx, *, command_line: str):
+    message = copy.copy(ctx.message)
+    message.content = f"{ctx.prefix}{command_line}"
+    traced_ctx = await bot.get_context(message)
+    if traced_ctx.command is None:
+        await ctx.send(f"❌ Unknown command: `{command_line.split()[0]}`")
+        return
+    trace = {'started': time.perf_counter(), 'depth': 0, 'spans': []}
+    token = current_trace.set(trace)
+    try:
+        with trace_span(f"command:{traced_ctx.command.name}"):
+            await bot.invoke(traced_ctx)
+    finally:
+        current_trace.reset(token)
+    report = format_trace(trace)
+    await ctx.send(f"🧭 Trace for `{command_line}`",
+                   file=discord.File(io.BytesIO(report.encode('utf-8')), filename="trace.txt"))
+
 # --- Access Control Error Handler ---
 @bot.event
 async def on_command_error(ctx, error):
@@ -466,8 +2898,10 @@ async def on_command_error(ctx, error):
         await ctx.send(f"❌ Error: {str(error)}")
 
 # 2. !monitorban @username
-@bot.command(description="Start monitoring an Instagram account for ban simulation")
+@bot.hybrid_command(description="Start monitoring an Instagram account for ban simulation")
 async def monitorban(ctx, username: str):
+    # Slash invocations are acknowledged right away; a no-op for prefix commands
+    await ctx.defer()
     username = username.lstrip('@')
     
     # Loading message
@@ -482,7 +2916,7 @@ async def monitorban(ctx, username: str):
     # Animate loading
     await animate_loading(loading_msg, username)
     
-    data = await get_instagram_data(username)
+    data = await fetch_scheduler.fetch(username, PRIORITY_INTERACTIVE, ctx.guild.id if ctx.guild else None)
     now = datetime.now().strftime('%H:%M:%S')
     
     if not data.get('success', False):
@@ -553,23 +2987,27 @@ async def monitorban(ctx, username: str):
         f"<b>Bio:</b> {bio}\n" \
         f"<b>Status:</b> Monitoring Active\n" \
         f"<b>Time Started:</b> {now}"
-    send_telegram_notification(telegram_message)
+    notify('monitor_started', telegram_message)
+
+    # Hand the account to the background poller (whichever instance owns its partition)
+    session = start_session(username, 'ban', data)
+    await coordinator.watch(username, 'ban', channel_id=ctx.channel.id,
+                            guild_id=ctx.guild.id if ctx.guild else None,
+                            followers=None if data.get('fallback') else data['followers'],
+                            started_at=session.started_at)
 
 # 3. !bandone
-@bot.command(description="Complete the ban monitoring process")
+@bot.hybrid_command(description="Complete the ban monitoring process")
 async def bandone(ctx, username: str = None):
+    # Slash invocations are acknowledged right away; a no-op for prefix commands
+    await ctx.defer()
     now = datetime.now().strftime('%H:%M:%S')
     if username:
         username = username.lstrip('@')
-        # Fetch real Instagram data
-        data = await get_instagram_data(username)
-        followers = data.get('followers', 0) if data.get('success', False) else 0
-        # Calculate time alive (simulated)
-        import random
-        hours = random.randint(1, 24)
-        minutes = random.randint(0, 59)
-        seconds = random.randint(0, 59)
-        time_alive = f"{hours} hour{'s' if hours != 1 else ''}, {minutes} minute{'s' if minutes != 1 else ''}, {seconds} second{'s' if seconds != 1 else ''}"
+        # Reuse what !monitorban (and the poller since) already fetched
+        session = await end_session(username)
+        followers = session.followers if session is not None else 0
+        time_alive = format_duration(session.elapsed()) if session is not None else "unknown (not monitored)"
         description = (
             f"🔥Account Status: @{username} has been banned\n"
             f"👥 Followers: {followers:,}\n"
@@ -589,11 +3027,13 @@ async def bandone(ctx, username: str = None):
     telegram_message = f"<b>🚫 Account Banned</b>\n" \
         f"{description}\n" \
         f"<b>Time:</b> {now}"
-    send_telegram_notification(telegram_message)
+    notify('ban', telegram_message)
 
 # 4. !monitorunban @username
-@bot.command(description="Start monitoring an Instagram account for unban simulation")
+@bot.hybrid_command(description="Start monitoring an Instagram account for unban simulation")
 async def monitorunban(ctx, username: str):
+    # Slash invocations are acknowledged right away; a no-op for prefix commands
+    await ctx.defer()
     username = username.lstrip('@')
     
     # Loading message
@@ -608,7 +3048,7 @@ async def monitorunban(ctx, username: str):
     # Animate loading
     await animate_loading(loading_msg, username)
     
-    data = await get_instagram_data(username)
+    data = await fetch_scheduler.fetch(username, PRIORITY_INTERACTIVE, ctx.guild.id if ctx.guild else None)
     now = datetime.now().strftime('%H:%M:%S')
     
     if not data.get('success', False):
@@ -679,23 +3119,27 @@ async def monitorunban(ctx, username: str):
         f"<b>Bio:</b> {bio}\n" \
         f"<b>Status:</b> Monitoring Active\n" \
         f"<b>Time Started:</b> {now}"
-    send_telegram_notification(telegram_message)
+    notify('monitor_started', telegram_message)
+
+    # Hand the account to the background poller (whichever instance owns its partition)
+    session = start_session(username, 'unban', data)
+    await coordinator.watch(username, 'unban', channel_id=ctx.channel.id,
+                            guild_id=ctx.guild.id if ctx.guild else None,
+                            followers=None if data.get('fallback') else data['followers'],
+                            started_at=session.started_at)
 
 # 5. !unbandone
-@bot.command(description="Complete the unban monitoring process")
+@bot.hybrid_command(description="Complete the unban monitoring process")
 async def unbandone(ctx, username: str = None):
+    # Slash invocations are acknowledged right away; a no-op for prefix commands
+    await ctx.defer()
     now = datetime.now().strftime('%H:%M:%S')
     if username:
         username = username.lstrip('@')
-        # Fetch real Instagram data
-        data = await get_instagram_data(username)
-        followers = data.get('followers', 0) if data.get('success', False) else 0
-        # Calculate time taken (simulated)
-        import random
-        hours = random.randint(1, 6)
-        minutes = random.randint(0, 59)
-        seconds = random.randint(0, 59)
-        time_taken = f"{hours} hour{'s' if hours != 1 else ''}, {minutes} minute{'s' if minutes != 1 else ''}, {seconds} second{'s' if seconds != 1 else ''}"
+        # Reuse what !monitorunban (and the poller since) already fetched
+        session = await end_session(username)
+        followers = session.followers if session is not None else 0
+        time_taken = format_duration(session.elapsed()) if session is not None else "unknown (not monitored)"
         description = (
             f"✅ Monitoring Status: @{username} has been unbanned\n"
             f"👥 Followers: {followers:,}\n"
@@ -715,7 +3159,7 @@ async def unbandone(ctx, username: str = None):
     telegram_message = f"<b>✅ Account Unbanned</b>\n" \
         f"{description}\n" \
         f"<b>Time:</b> {now}"
-    send_telegram_notification(telegram_message)
+    notify('unban', telegram_message)
 
 # 6. !commands (custom help command)
 @bot.command(description="Show all available commands with descriptions")
@@ -769,8 +3213,10 @@ async def commands(ctx):
     await ctx.send(embed=embed)
 
 # 7. !stats (new command)
-@bot.command(description="View bot statistics and information")
+@bot.hybrid_command(description="View bot statistics and information")
 async def stats(ctx):
+    # Slash invocations are acknowledged right away; a no-op for prefix commands
+    await ctx.defer()
     embed = discord.Embed(
         title="📊 Bot Statistics",
         description="Instagram Monitor Bot Information",
@@ -787,6 +3233,50 @@ async def stats(ctx):
     embed.add_field(name="🔧 **Commands**", value="`7`", inline=True)
     embed.add_field(name="📡 **Status**", value="🟢 **Online**", inline=True)
     embed.add_field(name="💻 **Library**", value="`discord.py`", inline=True)
+    rss = peak_rss_mb()
+    rss_text = f"{rss:.1f} MB" if rss is not None else "n/a"
+    embed.add_field(
+        name="🧠 **Memory**",
+        value=f"Peak RSS: `{rss_text}`\n"
+        f"Caches: `{memory_budget.used_bytes / 1024:.0f} / {memory_budget.limit_bytes / 1024:.0f} KB`\n"
+        f"Low-memory mode: `{'on' if LOW_MEMORY_MODE else 'off'}`",
+        inline=False
+    )
+    queue_lines = [
+        f"`{name}` queued {q['queued']} • served {q['served']} • wait p50 {q['p50_ms']:.0f}ms / p99 {q['p99_ms']:.0f}ms"
+        for name, q in fetch_scheduler.stats().items()
+    ]
+    embed.add_field(name="🗂️ **Fetch Queue**", value="\n".join(queue_lines), inline=False)
+    top_overruns = ", ".join(f"{stage} {count}" for stage, count in deadline_overruns.most_common(5))
+    embed.add_field(
+        name="⏱️ **Deadlines**",
+        value=f"Budget: command `{COMMAND_DEADLINE:.0f}s` • poll `{POLL_DEADLINE:.0f}s`\n"
+        f"Overruns: {top_overruns or '`none`'}",
+        inline=False
+    )
+    uptime = max(time.perf_counter() - _BOOT_STARTED, 1e-6)
+    top_events = ", ".join(f"{name} {count}" for name, count in gateway_events.most_common(3))
+    embed.add_field(
+        name="🛰️ **Gateway**",
+        value=f"Events: `{sum(gateway_events.values()) / uptime:.2f}/s` ({top_events or 'none yet'})\n"
+        f"CPU: `{100 * time.process_time() / uptime:.1f}%` avg\n"
+        f"Message content intent: `{'on' if bot.intents.message_content else 'off'}`",
+        inline=False
+    )
+    sink_lines = [
+        f"`{name[:32]}` ✅ {s['sent']} ❌ {s['failed']} 🗑️ {s['dropped']} 🔁 {s['retrying']} ⏳ {s['pending']}"
+        for name, s in notification_router.stats().items()
+    ]
+    if proxy_pool is not None:
+        proxy_lines = [
+            f"`{name[:32]}` ❤️ {p['score']} 🔁 {p['requests']} ⏳ {p['in_flight']}" + (f" 🧊 {p['cooldown']:.0f}s" if p['cooldown'] else "")
+            for name, p in proxy_pool.stats().items()
+        ]
+        embed.add_field(name="🌐 **Proxies**", value="\n".join(proxy_lines[:10]), inline=False)
+    digest = alert_digest.stats()
+    sink_lines.append(f"📦 {digest['digests']} digest(s) covering {digest['batched']} alerts" +
+                      (f" • batching {', '.join(digest['batching'])}" if digest['batching'] else ""))
+    embed.add_field(name="📨 **Notification Sinks**", value="\n".join(sink_lines[:11]), inline=False)
     
     embed.set_footer(text="Instagram Monitor Bot • Powered by MRNOL", icon_url=bot.user.avatar.url if bot.user.avatar else None)
     embed.set_author(name=ctx.author.display_name, icon_url=ctx.author.avatar.url if ctx.author.avatar else None)
@@ -818,6 +3308,11 @@ async def help(ctx):
         value="`!bandone` - Complete ban process\n`!unbandone` - Complete unban process",
         inline=False
     )
+    embed.add_field(
+        name="⚡ **Slash Commands**",
+        value="`/monitorban`, `/monitorunban`, `/bandone`, `/unbandone` and `/stats` work as slash commands too",
+        inline=False
+    )
     embed.add_field(
         name="💡 **Usage Example**",
         value="```!monitorban @instagram_username```\nThis will fetch real Instagram data and start monitoring.",
@@ -845,12 +3340,25 @@ async def on_command_error(ctx, error):
         try:
             await ctx.send(embed=embed)
         except Exception as e:
-            print(f"Error sending error message: {e}")
+            logger.error(f"Error sending error message: {e}")
             await ctx.send("❌ An error occurred. Please check bot permissions.")
     
     elif isinstance(error, commands.CommandNotFound):
         # Don't respond to unknown commands
         pass
+
+    elif isinstance(unwrap_command_error(error), DeadlineExceeded):
+        embed = discord.Embed(
+            title="⏱️ Timed Out",
+            description=f"Instagram didn't answer within `{COMMAND_DEADLINE:.0f}s`. Please try again in a moment.",
+            color=COLORS['warning'],
+            timestamp=datetime.utcnow()
+        )
+        embed.set_footer(text="Instagram Monitor Bot • Timeout", icon_url=bot.user.avatar.url if bot.user and bot.user.avatar else None)
+        try:
+            await ctx.send(embed=embed)
+        except Exception as e:
+            logger.error(f"Error sending timeout message: {e}")
     
     elif isinstance(error, commands.MissingPermissions):
         embed = discord.Embed(
@@ -863,12 +3371,15 @@ async def on_command_error(ctx, error):
         try:
             await ctx.send(embed=embed)
         except Exception as e:
-            print(f"Error sending permission error: {e}")
+            logger.error(f"Error sending permission error: {e}")
             await ctx.send("❌ Permission denied.")
     
     else:
         # Log the error and send a generic message
-        print(f"Command error in {ctx.command}: {error}")
+        logger.error(f"Command error in {ctx.command}: {error}", extra={'command': str(ctx.command), 'outcome': 'error'})
+        notify('error', f"<b>❌ Command Error</b>\n"
+               f"<b>Command:</b> {ctx.command}\n"
+               f"<b>Error:</b> {html.escape(str(error)[:500])}")
         embed = discord.Embed(
             title="❌ Unexpected Error",
             description="An unexpected error occurred while processing your command.",
@@ -880,7 +3391,7 @@ async def on_command_error(ctx, error):
         try:
             await ctx.send(embed=embed)
         except Exception as e:
-            print(f"Error sending error message: {e}")
+            logger.error(f"Error sending error message: {e}")
             await ctx.send("❌ An error occurred. Please try again later.")
 
 @bot.event
@@ -889,6 +3400,15 @@ async def on_message(message):
     # Don't respond to our own messages
     if message.author == bot.user:
         return
+
+    # Cheap early exit for the vast majority of guild chatter: no prefix and
+    # no mention means there is nothing for us to do
+    if not message.content.startswith(bot.command_prefix) and not message.mentions and not message.mention_everyone:
+        return
+
+    # With several instances running, only the lease-holding leader answers
+    if not coordinator.is_leader or shutting_down:
+        return
     
     # Check if bot is mentioned
     if bot.user.mentioned_in(message):
@@ -905,7 +3425,7 @@ async def on_message(message):
         try:
             await message.channel.send(embed=embed)
         except Exception as e:
-            print(f"Error responding to mention: {e}")
+            logger.error(f"Error responding to mention: {e}")
             await message.channel.send("🤖 Hi! Use `!commands` to see what I can do!")
     
     # Process commands
@@ -996,7 +3516,7 @@ async def debug(ctx):
         # Command prefix
         debug_embed.add_field(
             name="⚙️ **Configuration**",
-            value=f"**Prefix:** {bot.command_prefix}\n**Commands:** {len(bot.commands)}\n**Intents:** Message Content Enabled",
+            value=f"**Prefix:** {bot.command_prefix}\n**Commands:** {len(bot.commands)}\n**Intents:** Message Content {'Enabled' if bot.intents.message_content else 'Disabled (slash commands only)'}",
             inline=False
         )
         
@@ -1006,33 +3526,27 @@ async def debug(ctx):
         await ctx.send(embed=debug_embed)
         
         # Additional console output
-        print(f"🔧 Debug requested by {ctx.author} in {ctx.guild.name}#{ctx.channel.name}")
-        print(f"📊 Bot permissions: {bot_permissions}")
+        logger.info(f"🔧 Debug requested by {ctx.author} in {ctx.guild.name}#{ctx.channel.name}, permissions: {bot_permissions}")
         
     except Exception as e:
         await ctx.send(f"❌ Debug failed with error: {str(e)}")
-        print(f"Debug error: {e}")
+        logger.error(f"Debug error: {e}")
+
+IMPORT_SECONDS = time.perf_counter() - _BOOT_STARTED
 
 if __name__ == '__main__':
-    print("🔧 Starting Instagram Monitor Bot...")
-    print("📡 Connecting to Discord...")
+    logger.info("🔧 Starting Instagram Monitor Bot... 📡 Connecting to Discord...")
     try:
-        bot.run(TOKEN)
+        bot.run(TOKEN, log_handler=None)
     except KeyboardInterrupt:
-        print("\n" + "=" * 60)
-        print("🛑 BOT SHUTDOWN INITIATED")
-        print("=" * 60)
-        print("👋 Bot is shutting down gracefully...")
-        print("📝 Thank you for using Instagram Monitor Bot!")
-        print("=" * 60)
+        logger.info("🛑 BOT SHUTDOWN INITIATED 👋 Bot is shutting down gracefully...")
     except Exception as e:
-        print("\n" + "=" * 60)
-        print("❌ ERROR STARTING BOT")
-        print("=" * 60)
-        print(f"🔍 Error: {e}")
-        print("💡 Check your token and internet connection")
-        print("=" * 60)
+        logger.error(f"❌ ERROR STARTING BOT: {e} 💡 Check your token and internet connection")
     finally:
-        import asyncio
+        # Sessions are normally closed by graceful_shutdown; this only runs
+        # if the bot never got as far as starting its event loop
         if session and not session.closed:
-            asyncio.run(session.close())
\ No newline at end of file
+            asyncio.run(session.close())
+        if notify_session and not notify_session.closed:
+            asyncio.run(notify_session.close())
+        stop_logging()
\ No newline at end of file
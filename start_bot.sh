@@ -4,5 +4,6 @@
 # Change to the bot directory
 cd "$(dirname "$0")"
 
-# Start the bot and log output
-python3.11 bot.py >> bot.log 2>&1 
\ No newline at end of file
+# Start the bot. bot.py writes structured, rotated logs to bot.log itself; only stray
+# output (e.g. a crash traceback) lands in bot.console.log
+LOG_CONSOLE=0 python3.11 bot.py >> bot.console.log 2>&1 
\ No newline at end of file